@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Gas estimation by binary search from scratch vs resuming from checkpoints.
+
+Run from the `python` directory:
+
+    python -m benchmarks.bench_estimate_gas [iterations]
+
+The workload loops, then checks the gas it has left with GAS, so every
+probe of the search has to run again from where that check starts.
+"""
+import sys
+import time
+
+from yolo_evm.checkpoint import estimate_gas
+from yolo_evm.ExecutionContext import ExecutionContext
+from yolo_evm.opcodes import *
+from yolo_evm.runner import execute
+
+
+def workload(iterations: int) -> bytes:
+    # counts down from iterations, then fails unless 10000 gas is left
+    head = assemble([PUSH(iterations)], print_bin=False)
+    return head + assemble([
+        JUMPDEST,
+        PUSH(1), SWAP1, SUB,
+        DUP1, PUSH(len(head)), JUMPI,
+        PUSH(10_000), GAS, LT, PUSH(0), JUMPI, STOP,
+    ], print_bin=False)
+
+
+def from_scratch(code: bytes, gas_cap: int) -> int:
+    lo, hi = 0, gas_cap
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        ctx = ExecutionContext(code=code, gas=mid)
+        execute(ctx)
+        if ctx.success:
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    code = workload(iterations)
+    gas_cap = 30_000_000
+
+    start = time.perf_counter()
+    ctx = ExecutionContext(code=code, gas=gas_cap)
+    execute(ctx)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = from_scratch(code, gas_cap)
+    scratch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    estimate = estimate_gas(code, gas_cap=gas_cap)
+    resumed = time.perf_counter() - start
+
+    assert estimate == expected, (estimate, expected)
+    print(f"estimate: {estimate} gas")
+    print(f"one execution:      {single * 1000:8.1f} ms")
+    print(f"from scratch:       {scratch * 1000:8.1f} ms")
+    print(f"from checkpoints:   {resumed * 1000:8.1f} ms  ({scratch / resumed:.1f}x)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
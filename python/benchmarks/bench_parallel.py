@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Serial vs optimistic parallel block execution on independent transactions,
+over several blocks sharing one BlockExecutor.
+
+Run from the `python` directory:
+
+    python -m benchmarks.bench_parallel [transactions] [workers] [blocks]
+"""
+import os
+import sys
+import time
+
+from yolo_evm.environment import BlockEnvironment
+from yolo_evm.parallel import BlockExecutor
+from yolo_evm.transaction import Transaction, apply_transaction
+from yolo_evm.WorldState import WorldState
+
+# count down from calldata[0], then storage[CALLER] = 1
+WORKLOAD = bytes.fromhex("6000355b600190038060035760013355")
+WORKLOAD_ADDRESS = 0xAA
+ITERATIONS = 2000
+GAS_LIMIT = 200_000
+
+
+def genesis(senders: int) -> WorldState:
+    state = WorldState()
+    state.set_code(WORKLOAD_ADDRESS, WORKLOAD)
+    state.commit()
+    return state
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    blocks = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    transactions = [
+        [
+            Transaction(sender, WORKLOAD_ADDRESS, nonce=nonce, data=ITERATIONS.to_bytes(32, "big"), gas_limit=GAS_LIMIT)
+            for sender in range(1, count + 1)
+        ]
+        for nonce in range(blocks)
+    ]
+    block = BlockEnvironment(gaslimit=GAS_LIMIT * count)
+
+    state = genesis(count)
+    start = time.perf_counter()
+    expected = [[apply_transaction(state, tx, block) for tx in txs] for txs in transactions]
+    serial = time.perf_counter() - start
+
+    parallel_state = genesis(count)
+    start = time.perf_counter()
+    with BlockExecutor(parallel_state, max_workers=workers) as executor:
+        results = [executor.execute_block(txs, block) for txs in transactions]
+    parallel = time.perf_counter() - start
+
+    assert results == expected and parallel_state.data == state.data
+    print(f"{blocks} blocks of {count} transactions, {workers} workers")
+    print(f"serial:   {serial:.2f}s")
+    print(f"parallel: {parallel:.2f}s ({serial / parallel:.1f}x)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
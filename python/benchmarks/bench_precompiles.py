@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the precompiled contracts, against what they charge.
+
+Run from the `python` directory:
+
+    python -m benchmarks.bench_precompiles
+
+For every precompile this reports the cost of one uncached run, its gas
+price for the same input and the time per unit of gas; a precompile whose
+ns/gas stands far above the rest is underpriced for this implementation.
+The last column is a repeated input answered from the result cache.
+"""
+import sys
+import timeit
+
+from yolo_evm import bn254, secp256k1
+from yolo_evm.blake2 import IV
+from yolo_evm.keccak import keccak256
+from yolo_evm.precompiles import PRECOMPILES
+
+REPEAT = 3
+
+
+def _word(x: int) -> bytes:
+    return x.to_bytes(32, "big")
+
+
+def _ecrecover_input() -> bytes:
+    msg_hash = int.from_bytes(keccak256(b"bench"), "big")
+    k = 0xC0FFEE
+    x, y = secp256k1.multiply(secp256k1.G, k)
+    r = x % secp256k1.N
+    s = pow(k, -1, secp256k1.N) * (msg_hash + r * 1) % secp256k1.N
+    return _word(msg_hash) + _word(27 + (y & 1)) + _word(r) + _word(s)
+
+
+def _pairing_input() -> bytes:
+    out = bytes()
+    for p in (bn254.G1, bn254.g1_neg(bn254.G1)):
+        (x_re, x_im), (y_re, y_im) = bn254.G2
+        out += _word(p[0]) + _word(p[1]) + _word(x_im) + _word(x_re) + _word(y_im) + _word(y_re)
+    return out
+
+
+def _blake2f_input() -> bytes:
+    h = list(IV)
+    h[0] ^= 0x01010040
+    return (
+        (12).to_bytes(4, "big")
+        + b"".join(x.to_bytes(8, "little") for x in h)
+        + b"abc".ljust(128, b"\x00")
+        + (3).to_bytes(8, "little") + bytes(8)
+        + b"\x01"
+    )
+
+
+P256K1 = 2 ** 256 - 2 ** 32 - 977
+
+# address -> (input, runs per timing)
+INPUTS = {
+    0x01: (_ecrecover_input(), 20),
+    0x02: (bytes(1024), 2000),
+    0x03: (bytes(1024), 2000),
+    0x04: (bytes(1024), 20000),
+    0x05: (_word(32) * 3 + _word(3) + _word(P256K1 - 1) + _word(P256K1), 200),
+    0x06: (_word(1) + _word(2) + _word(1) + _word(2), 200),
+    0x07: (_word(1) + _word(2) + _word(2 ** 255 + 1), 20),
+    0x08: (_pairing_input(), 1),
+    0x09: (_blake2f_input(), 200),
+}
+
+
+def _time(func, data: bytes, number: int) -> float:
+    return min(timeit.repeat(lambda: func(data), number=number, repeat=REPEAT)) / number * 1e9
+
+
+def main():
+    print(f"{'precompile':<12}{'gas':>8}{'us/call':>12}{'ns/gas':>10}{'cached ns':>12}")
+    for address, (data, number) in INPUTS.items():
+        precompile = PRECOMPILES[address]
+        # the memoized run, bypassed to time the computation itself
+        compute = getattr(precompile.run, "__wrapped__", precompile.run)
+        gas = precompile.gas(data)
+        ns = _time(compute, data, number)
+        precompile.run(data)
+        cached = _time(precompile.run, data, 10000)
+        print(f"{precompile.name:<12}{gas:>8}{ns / 1000:>12.1f}{ns / gas:>10.1f}{cached:>12.1f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
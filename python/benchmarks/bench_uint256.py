@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the arithmetic, comparison and bitwise handlers.
+
+Run from the `python` directory:
+
+    python -m benchmarks.bench_uint256
+
+For every handler this reports the cost of one call (operands pushed by the
+harness are subtracted out), next to the naive `% 2**256` formulation the
+handlers used before, where there is one.
+"""
+import sys
+import timeit
+
+from yolo_evm.ExecutionContext import ExecutionContext
+from yolo_evm.opcodes import REGISTRY
+
+N = 200_000
+REPEAT = 5
+
+BIG = 2 ** 255 + 0xDEADBEEF
+NEG = 2 ** 256 - 7
+
+# operands, top of the stack first
+OPERANDS = {
+    "ADD": (BIG, BIG),
+    "MUL": (BIG, BIG),
+    "SUB": (3, BIG),
+    "DIV": (BIG, 7),
+    "SDIV": (NEG, 3),
+    "MOD": (BIG, 7),
+    "SMOD": (NEG, 3),
+    "ADDMOD": (BIG, BIG, 12345),
+    "MULMOD": (BIG, BIG, 12345),
+    "EXP": (BIG, 2 ** 64 - 1),
+    "SIGNEXTEND": (0, 0xFF),
+    "LT": (BIG, NEG),
+    "GT": (BIG, NEG),
+    "SLT": (BIG, NEG),
+    "SGT": (BIG, NEG),
+    "EQ": (BIG, NEG),
+    "ISZERO": (BIG,),
+    "AND": (BIG, NEG),
+    "OR": (BIG, NEG),
+    "XOR": (BIG, NEG),
+    "NOT": (BIG,),
+    "BYTE": (3, BIG),
+    "SHL": (17, BIG),
+    "SHR": (17, BIG),
+    "SAR": (17, NEG),
+}
+
+# what the handlers looked like before the uint256 module
+NAIVE = {
+    "ADD": lambda ctx: ctx.stack.push((ctx.stack.pop() + ctx.stack.pop()) % 2 ** 256),
+    "MUL": lambda ctx: ctx.stack.push(int(ctx.stack.pop() * ctx.stack.pop()) % 2 ** 256),
+    "SUB": lambda ctx: ctx.stack.push((ctx.stack.pop() - ctx.stack.pop()) % 2 ** 256),
+}
+
+
+def _time(handler, operands) -> float:
+    ctx = ExecutionContext()
+    items = ctx.stack.stack
+    # the stack grows to the right, so the top operand goes last
+    args = list(reversed(operands))
+
+    def step():
+        items.extend(args)
+        handler(ctx)
+        items.pop()
+
+    def baseline():
+        items.extend(args)
+        del items[-len(args):]
+        items.append(0)
+        items.pop()
+
+    cost = min(timeit.repeat(step, number=N, repeat=REPEAT))
+    base = min(timeit.repeat(baseline, number=N, repeat=REPEAT))
+    return max(cost - base, 0.0) / N * 1e9
+
+
+def main():
+    print(f"{'opcode':<12}{'ns/op':>10}{'naive ns/op':>14}")
+    for name, operands in OPERANDS.items():
+        ns = _time(REGISTRY[name].execute, operands)
+        naive = f"{_time(NAIVE[name], operands):>14.1f}" if name in NAIVE else f"{'-':>14}"
+        print(f"{name:<12}{ns:>10.1f}{naive}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
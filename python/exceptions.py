@@ -18,4 +18,7 @@ class InvalidCodeOffset(EVMException):
 
 @dataclass
 class InvalidJumpDestination(EVMException):
-    target_pc: int
\ No newline at end of file
+    target_pc: int
+
+    def __str__(self) -> str:
+        return f"Invalid jump destination {self.target_pc}"
@@ -0,0 +1,111 @@
+from yolo_evm.checkpoint import CheckpointRecorder, GasEstimationFailed, estimate_gas
+from yolo_evm.ExecutionContext import Calldata, ExecutionContext
+from yolo_evm.opcodes import *
+from yolo_evm.runner import execute
+from yolo_evm.WorldState import StateOverlay, WorldState
+
+import pytest
+
+CONTRACT = 0xC0
+CALLEE = 0xCA
+
+
+def succeeds(code: bytes, gas_limit: int, state: WorldState = None, calldata: bytes = bytes()) -> bool:
+    ctx = ExecutionContext(
+        code=code,
+        calldata=Calldata(calldata),
+        gas=gas_limit,
+        state=StateOverlay(state if state is not None else WorldState()),
+        address=CONTRACT,
+    )
+    execute(ctx)
+    return ctx.success
+
+
+def lowest_gas_limit(code: bytes, state: WorldState = None, calldata: bytes = bytes()) -> int:
+    # what estimate_gas has to find, by running from scratch every time
+    lo, hi = 0, 30_000_000
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if succeeds(code, mid, state, calldata):
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
+def loop(iterations: int) -> list:
+    # counts down from iterations, storing to memory as it goes
+    return [
+        PUSH(iterations),
+        JUMPDEST,
+        DUP1, DUP1, MSTORE,
+        PUSH(1), SWAP1, SUB,
+        DUP1, PUSH(2), JUMPI,
+        POP,
+    ]
+
+
+def test_code_that_never_reads_gas_needs_no_probe():
+    code = assemble(loop(50) + [PUSH(1), PUSH(0), SSTORE], print_bin=False)
+    estimate = estimate_gas(code, address=CONTRACT)
+    assert estimate == lowest_gas_limit(code)
+    assert succeeds(code, estimate) and not succeeds(code, estimate - 1)
+
+
+def test_estimate_when_gas_left_decides_the_outcome():
+    # fails unless at least 10000 gas is left after the loop
+    code = assemble(loop(20) + [
+        PUSH(10_000), GAS, LT, PUSH(0), JUMPI, STOP,
+    ], print_bin=False)
+    assert estimate_gas(code, address=CONTRACT) == lowest_gas_limit(code)
+
+    # only the block with the GAS in it is checkpointed
+    recorder = CheckpointRecorder(1_000_000)
+    execute(ExecutionContext(code=code, gas=1_000_000), checkpoints=recorder)
+    [checkpoint] = recorder.checkpoints
+    # the block after the loop, which ends with the GAS
+    assert checkpoint.context.pc == code.index(bytes([POP.opcode]))
+
+
+def test_estimate_through_a_call():
+    # the callee's loop needs gas, the caller forwards 63/64 of what it has
+    state = WorldState()
+    state.set_code(CALLEE, assemble(loop(30) + [PUSH(1), PUSH(0), SSTORE], print_bin=False))
+    call = assemble(loop(10) + [PUSH(0), PUSH(0), PUSH(0), PUSH(0), PUSH(0), PUSH(CALLEE), GAS, CALL], print_bin=False)
+    # fails if the call did
+    code = call + assemble([PUSH(len(call) + 4), JUMPI, INVALID, JUMPDEST], print_bin=False)
+
+    estimate = estimate_gas(code, state=state, address=CONTRACT)
+    assert estimate == lowest_gas_limit(code, state)
+    # only ever read
+    assert state.storage(CALLEE, 0) == 0
+
+
+def test_resume_matches_a_fresh_run():
+    code = assemble(loop(40) + [PUSH(7), PUSH(0), SSTORE, GAS, PUSH(0), MSTORE, PUSH(32), PUSH(0), RETURN], print_bin=False)
+    state = WorldState()
+    ctx = ExecutionContext(code=code, gas=1_000_000, state=state)
+    recorder = CheckpointRecorder(1_000_000, interval=8)
+    execute(ctx, checkpoints=recorder)
+    assert recorder.reads_gas and len(recorder.checkpoints) > 2
+
+    checkpoint = recorder.latest(900_000)
+    resumed = recorder.resume(checkpoint, 900_000)
+    assert recorder.checkpoints[-1] is checkpoint
+    # the SSTORE was rolled back, and is made again
+    assert state.storage(0, 0) == 0
+    execute(resumed)
+
+    fresh = ExecutionContext(code=code, gas=900_000)
+    execute(fresh)
+    assert resumed.success and resumed.returndata == fresh.returndata
+    assert resumed.gas == fresh.gas
+    assert state.storage(0, 0) == 7
+
+
+def test_estimate_failure():
+    with pytest.raises(GasEstimationFailed):
+        estimate_gas(assemble([INVALID], print_bin=False))
+    with pytest.raises(GasEstimationFailed):
+        estimate_gas(assemble(loop(10), print_bin=False), gas_cap=100)
@@ -0,0 +1,88 @@
+from yolo_evm.corpus import Corpus, build_corpus, main
+from yolo_evm.runner import run
+
+import pytest
+
+FOUR_SQUARED = bytes.fromhex("60048060005b8160125760005360016000f35b8201906001900390600556")
+ADD = bytes.fromhex("6001600201")
+
+
+@pytest.fixture
+def corpus_path(tmp_path):
+    path = str(tmp_path / "test.corpus")
+    build_corpus(path, [
+        (0xA, FOUR_SQUARED),
+        (0xB, ADD),
+        (0xC, FOUR_SQUARED),
+        (0xD, bytes()),
+    ], max_workers=2)
+    return path
+
+
+def test_identical_code_is_stored_once(corpus_path):
+    with Corpus(corpus_path) as corpus:
+        assert len(corpus) == 4
+        assert corpus.unique_codes == 3
+        a, c = corpus[0], corpus[2]
+        assert (a.address, c.address) == (0xA, 0xC)
+        assert a.code_index == c.code_index
+        assert a.analysis is c.analysis
+        assert corpus.find(ADD) == corpus[1].code_index
+        assert corpus.find(b"\x00") == -1
+
+
+def test_contracts_run_from_the_mapped_file(corpus_path):
+    with Corpus(corpus_path) as corpus:
+        contract = corpus[0]
+        assert isinstance(contract.code, memoryview)
+        assert bytes(contract.code) == FOUR_SQUARED
+
+        ctx = run(contract.code, analysis=contract.analysis)
+        assert ctx.success
+        assert ctx.returndata == bytes([16])
+
+        assert run(corpus[3].code, analysis=corpus[3].analysis).success
+
+
+def test_stored_analysis_matches_a_fresh_one(corpus_path):
+    from yolo_evm.analysis import analyse
+
+    with Corpus(corpus_path) as corpus:
+        stored = corpus.analysis(corpus[0].code_index)
+        fresh = analyse(FOUR_SQUARED)
+        assert stored.jumpdests == fresh.jumpdests
+        assert stored.blocks == fresh.blocks
+
+
+def test_build_from_listing(tmp_path, capsys):
+    listing = tmp_path / "contracts.txt"
+    listing.write_text(f"0xa 0x{ADD.hex()}\n# comment\n0xb {ADD.hex()}\n")
+    out = str(tmp_path / "out.corpus")
+
+    assert main(["build", out, str(listing), "--workers", "1"]) == 0
+    assert "2 contracts, 1 unique codes" in capsys.readouterr().out
+
+
+def test_analysis_for_another_fork_is_redone(corpus_path):
+    from yolo_evm.forks import FRONTIER, LATEST
+
+    with Corpus(corpus_path) as corpus:
+        assert corpus.analysed_under == LATEST.name
+        assert not corpus.stale
+        assert corpus[0].analysis.hardfork is LATEST
+
+    with Corpus(corpus_path, FRONTIER) as corpus:
+        assert corpus.stale
+        analysis = corpus[0].analysis
+        assert analysis.hardfork is FRONTIER
+        assert run(corpus[0].code, analysis=analysis, hardfork=FRONTIER).returndata == bytes([16])
+
+
+def test_analysis_under_older_rules_is_redone(corpus_path, monkeypatch):
+    from yolo_evm import corpus as corpus_module
+    from yolo_evm.analysis import analyse
+
+    monkeypatch.setattr(corpus_module, "ANALYSIS_VERSION", corpus_module.ANALYSIS_VERSION + 1)
+    with Corpus(corpus_path) as corpus:
+        assert corpus.stale
+        assert corpus[1].analysis.blocks == analyse(ADD).blocks
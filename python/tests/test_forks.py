@@ -0,0 +1,120 @@
+import pickle
+
+import pytest
+
+from yolo_evm.environment import BlockEnvironment
+from yolo_evm.forks import BYZANTIUM, CANCUN, FRONTIER, ISTANBUL, UnknownHardfork, get_hardfork
+from yolo_evm.gas import STATIC_GAS
+from yolo_evm.opcodes import *
+from yolo_evm.runner import run
+from yolo_evm.transaction import Transaction, apply_transaction
+from yolo_evm.WorldState import WorldState
+
+
+def gas_used(code: bytes, hardfork) -> int:
+    ctx = run(code, gas_limit=1_000_000, hardfork=hardfork)
+    assert ctx.success
+    return 1_000_000 - ctx.gas
+
+
+def test_get_hardfork():
+    assert get_hardfork(None) is CANCUN
+    assert get_hardfork("Tangerine-Whistle").name == "tangerine_whistle"
+    assert get_hardfork(BYZANTIUM) is BYZANTIUM
+    with pytest.raises(UnknownHardfork):
+        get_hardfork("prague")
+    # forks pickle by name and come back as the same object
+    assert pickle.loads(pickle.dumps(ISTANBUL)) is ISTANBUL
+
+
+def test_later_instructions_are_invalid_in_older_forks():
+    for code, introduced_in in (
+        ([PUSH0], "shanghai"),
+        ([PUSH(1), PUSH(1), SHL], "constantinople"),
+        ([CHAINID], "istanbul"),
+        ([RETURNDATASIZE], "byzantium"),
+    ):
+        code = assemble(code, print_bin=False)
+        assert run(code, hardfork=introduced_in).success
+        assert not run(code, hardfork=get_hardfork(introduced_in).parent).success
+        assert "PUSH0" not in FRONTIER and "PUSH0" in CANCUN
+
+
+def test_latest_tables_match_static_gas():
+    for instruction in REGISTRY:
+        assert CANCUN.gas_table[instruction.opcode] == STATIC_GAS.get(instruction.name, 0)
+    assert PUSH0.opcode in FRONTIER.block_terminators
+    assert PUSH0.opcode not in CANCUN.block_terminators
+
+
+def test_repricing():
+    sload = assemble([PUSH(0), SLOAD], print_bin=False)
+    assert gas_used(sload, "istanbul") - gas_used(sload, "frontier") == 800 - 50
+
+    # EXP pays per byte of exponent: 10 before Spurious Dragon, 50 after
+    exp = assemble([PUSH(0x0101), PUSH(2), EXP], print_bin=False)
+    assert gas_used(exp, "spurious_dragon") - gas_used(exp, "tangerine_whistle") == 2 * (50 - 10)
+
+
+def test_frontier_call_forwards_requested_gas():
+    # asks for more gas than there is: EIP-150 caps it, Frontier runs out
+    code = assemble([PUSH(0), PUSH(0), PUSH(0), PUSH(0), PUSH(0), PUSH(0x04), PUSH(50_000), CALL], print_bin=False)
+    assert run(code, gas_limit=40_000, hardfork="tangerine_whistle").success
+    assert not run(code, gas_limit=40_000, hardfork="homestead").success
+
+
+def test_calling_a_new_account_without_value():
+    # before EIP-161 a call to an account that does not exist pays for
+    # creating it, value or not
+    code = assemble([PUSH(0), PUSH(0), PUSH(0), PUSH(0), PUSH(0), PUSH(0xAB), PUSH(0), CALL], print_bin=False)
+    assert gas_used(code, "frontier") == 7 * 3 + 40 + 25000
+    assert gas_used(code, "tangerine_whistle") == 7 * 3 + 700 + 25000
+    assert gas_used(code, "spurious_dragon") == 7 * 3 + 700
+    # a precompile always exists
+    precompile = assemble([PUSH(0), PUSH(0), PUSH(0), PUSH(0), PUSH(0), PUSH(0x04), PUSH(0), CALL], print_bin=False)
+    assert gas_used(precompile, "frontier") == 7 * 3 + 40
+
+
+def test_precompiles_per_fork():
+    assert 0x05 not in FRONTIER.precompiles
+    assert 0x09 not in BYZANTIUM.precompiles and 0x09 in ISTANBUL.precompiles
+    # MODEXP 2 ** 3 % 5 with one-byte operands: EIP-198 divides by 20,
+    # EIP-2565 has a floor of 200
+    data = (1).to_bytes(32, "big") * 3 + bytes([2, 3, 5])
+    assert BYZANTIUM.precompiles[0x05].gas(data) == 1 * 1 * 1 // 20
+    assert CANCUN.precompiles[0x05].gas(data) == 200
+    assert BYZANTIUM.precompiles[0x05].run(data) == CANCUN.precompiles[0x05].run(data) == bytes([3])
+    assert ISTANBUL.precompiles[0x06].gas(b"") == 150 and BYZANTIUM.precompiles[0x06].gas(b"") == 500
+
+
+def test_mcopy():
+    code = assemble([
+        PUSH(0xABCD), PUSH(0), MSTORE,
+        PUSH(32), PUSH(0), PUSH(16), MCOPY,
+        PUSH(64), PUSH(0), RETURN,
+    ], print_bin=False)
+    ctx = run(code)
+    assert ctx.success
+    # the overlapping copy reads the source as it was before the write
+    assert ctx.returndata == bytes(46) + bytes([0xAB, 0xCD]) + bytes(16)
+
+
+def test_transient_storage_is_cleared_after_each_transaction():
+    # returns the transient slot 0, then sets it to 7
+    code = assemble([
+        PUSH(0), TLOAD, PUSH(0), MSTORE,
+        PUSH(7), PUSH(0), TSTORE,
+        PUSH(32), PUSH(0), RETURN,
+    ], print_bin=False)
+    state = WorldState()
+    state.set_code(0xC0, code)
+    state.commit()
+    block = BlockEnvironment(hardfork="cancun")
+
+    first = apply_transaction(state, Transaction(0x5E, 0xC0), block)
+    second = apply_transaction(state, Transaction(0x5E, 0xC0, nonce=1), block)
+    assert first.success and second.success
+    assert first.returndata == second.returndata == bytes(32)
+    assert state.transient_storage(0xC0, 0) == 0
+
+    assert not apply_transaction(state, Transaction(0x5E, 0xC0, nonce=2), BlockEnvironment(hardfork="shanghai")).success
@@ -0,0 +1,78 @@
+from yolo_evm.ExecutionContext import ExecutionContext
+from yolo_evm.opcodes import *
+from yolo_evm.runner import execute, run, ExecutionLimitReached
+from yolo_evm.WorldState import WorldState
+
+import pytest
+
+INFINITE_LOOP = [
+    JUMPDEST,
+    PUSH(0),
+    JUMP,
+]
+
+
+def test_out_of_gas_fails_the_context():
+    # 3 + 3 + 3 gas
+    code = assemble([PUSH(1), PUSH(2), ADD], print_bin=False)
+    assert run(code, gas_limit=9).success is True
+
+    ctx = run(code, gas_limit=8)
+    assert ctx.success is False
+    assert ctx.gas == 0
+
+    # any other exceptional halt burns the gas that was left too
+    for code in (assemble([ADD], print_bin=False), assemble([INVALID], print_bin=False)):
+        ctx = run(code, gas_limit=100)
+        assert ctx.success is False
+        assert ctx.gas == 0
+
+
+def test_remaining_gas():
+    code = assemble([PUSH(1), PUSH(2), ADD, STOP], print_bin=False)
+    assert run(code, gas_limit=100).gas == 91
+
+
+def test_infinite_loop_runs_out_of_gas():
+    ctx = run(assemble(INFINITE_LOOP, print_bin=False), gas_limit=10_000)
+    assert ctx.success is False
+
+
+def test_exp_charges_per_exponent_byte():
+    # 3 + 3 + 10 + 50 * 2
+    code = assemble([PUSH(0x100), PUSH(2), EXP], print_bin=False)
+    assert run(code, gas_limit=116).success is True
+    assert run(code, gas_limit=115).success is False
+
+
+def test_memory_expansion_is_charged_before_allocating():
+    """an MSTORE8 way out in memory must not try to allocate it"""
+    code = assemble([PUSH(1), PUSH(2 ** 64), MSTORE8], print_bin=False)
+    ctx = run(code, gas_limit=1_000_000)
+    assert ctx.success is False
+    assert len(ctx.memory) == 0
+
+
+def test_max_memory():
+    code = assemble([PUSH(1), PUSH(4096), MSTORE8], print_bin=False)
+    assert run(code, max_memory=8192).success is True
+
+    with pytest.raises(ExecutionLimitReached):
+        run(code, max_memory=4096)
+
+
+def test_max_time():
+    with pytest.raises(ExecutionLimitReached):
+        run(assemble(INFINITE_LOOP, print_bin=False), max_time=0.05)
+
+
+def test_budgets_cover_nested_calls():
+    # CALLs, with all the gas it has, into an infinite loop
+    state = WorldState()
+    state.set_code(0xCA, assemble(INFINITE_LOOP, print_bin=False))
+    code = assemble([PUSH(0), PUSH(0), PUSH(0), PUSH(0), PUSH(0), PUSH(0xCA), GAS, CALL], print_bin=False)
+
+    with pytest.raises(ExecutionLimitReached):
+        execute(ExecutionContext(code=code, gas=10 ** 12, state=state), max_steps=1000)
+    with pytest.raises(ExecutionLimitReached):
+        execute(ExecutionContext(code=code, gas=10 ** 12, state=state), max_time=0.05)
@@ -0,0 +1,88 @@
+from yolo_evm.ExecutionContext import ExecutionContext
+from yolo_evm.Memory import PAGE_SIZE, Memory
+from yolo_evm.opcodes import *
+from yolo_evm.runner import execute, run
+
+
+def test_sparse_memory_allocates_one_page():
+    memory = Memory()
+    memory.store(2 ** 40, 0xAB)
+
+    assert len(memory) == 2 ** 40 + 32
+    assert len(memory.pages) == 1
+    assert memory.load(2 ** 40) == 0xAB
+    assert memory.load(2 ** 39) == 0
+    assert memory.load_range(2 ** 40 - 2, 4) == bytes([0, 0, 0xAB, 0])
+
+
+def test_ranges_across_pages():
+    memory = Memory()
+    data = bytes(range(256)) * 40
+    memory.store_range(PAGE_SIZE - 100, data)
+
+    assert len(memory.pages) == 4
+    assert memory.load_range(PAGE_SIZE - 100, len(data)) == data
+    assert memory.load_range(PAGE_SIZE - 102, 4) == bytes([0, 0, 0, 1])
+
+
+def test_mstore8_at_a_huge_offset():
+    code = assemble([PUSH(1), PUSH(2 ** 36), MSTORE8, MSIZE], print_bin=False)
+    ctx = run(code)
+    assert ctx.success
+    assert ctx.stack.pop() == 2 ** 36 + 32
+    assert len(ctx.memory.pages) == 1
+
+
+def test_fork_is_copy_on_write():
+    memory = Memory()
+    memory.store_range(0, b"\x01" * (2 * PAGE_SIZE))
+    forked = memory.fork()
+
+    # the fork shares both pages until someone writes
+    assert forked.pages[0] is memory.pages[0]
+
+    forked.store(0, 2)
+    memory.store(PAGE_SIZE, 3)
+    assert (memory.load(0), forked.load(0)) == (1, 2)
+    assert (memory.load(PAGE_SIZE), forked.load(PAGE_SIZE)) == (3, 1)
+    # each side copied only the page it wrote
+    assert forked.pages[1] is not memory.pages[1]
+    assert forked.pages[0] is not memory.pages[0]
+
+    memory.store(1, 4)
+    assert forked.load(1) == 1
+
+
+def test_fork_context_at_a_branch():
+    code = assemble([
+        PUSH(0xAA), PUSH(0), MSTORE8,
+        PUSH(0), PUSH(16), JUMPI,
+        # 10: fall through
+        PUSH(0xBB), PUSH(1), MSTORE8, STOP,
+        # 16: jump taken
+        JUMPDEST, PUSH(0xCC), PUSH(1), MSTORE8, STOP,
+    ], print_bin=False)
+
+    # where the JUMPI leaves things, whichever way it goes
+    ctx = ExecutionContext(code=code)
+    ctx.memory.store(0, 0xAA)
+    ctx.pc = 10
+
+    # explore both sides
+    forked = ctx.fork()
+    forked.pc = 16
+    execute(ctx)
+    execute(forked)
+
+    assert ctx.memory.load_range(0, 2) == bytes([0xAA, 0xBB])
+    assert forked.memory.load_range(0, 2) == bytes([0xAA, 0xCC])
+
+
+def test_str_shows_only_written_pages(capsys):
+    memory = Memory()
+    memory.store(2 ** 40, 0xAB)
+    assert str(memory) == f"0x{2 ** 40:x}: ab" + "00" * 31
+
+    # a verbose run prints memory after every step
+    run(assemble([PUSH(0xAB), PUSH(2 ** 40), MSTORE8], print_bin=False), verbose=True)
+    assert f"0x{2 ** 40:x}: ab" in capsys.readouterr().out
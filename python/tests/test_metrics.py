@@ -0,0 +1,100 @@
+import urllib.request
+
+from yolo_evm import metrics
+from yolo_evm.opcodes import *
+from yolo_evm.runner import run, ExecutionLimitReached
+
+import pytest
+
+# counts down from 3: 3 + 3 * 7 + 2 instructions
+COUNTDOWN = [
+    PUSH(3),
+    # 2
+    JUMPDEST,
+    PUSH(1), SWAP1, SUB,
+    DUP1, PUSH(2), JUMPI,
+    POP, STOP,
+]
+
+
+@pytest.fixture
+def registry():
+    registry = metrics.enable()
+    yield registry
+    metrics.disable()
+
+
+def test_counts_instructions_by_opcode(registry):
+    ctx = run(assemble(COUNTDOWN, print_bin=False))
+    assert ctx.success
+
+    assert registry.executions == 1
+    assert registry.instructions == 1 + 3 * 7 + 2
+    assert registry.opcodes[SUB.opcode] == 3
+    assert registry.opcodes[JUMPI.opcode] == 3
+    assert registry.opcodes[POP.opcode] == 1
+    assert registry.halts == {"stop": 1}
+    assert registry.gas_used.count == 1
+
+
+def test_exceptional_halt_mid_block_is_counted_exactly(registry):
+    # ADD underflows, so the PUSH and STOP after it never run
+    run(assemble([PUSH(1), ADD, PUSH(2), STOP], print_bin=False))
+
+    assert registry.instructions == 2
+    assert registry.opcodes[ADD.opcode] == 1
+    assert registry.opcodes[STOP.opcode] == 0
+    assert registry.halts == {"error": 1}
+
+
+def test_halt_reasons(registry):
+    run(assemble([PUSH(0), PUSH(0), RETURN], print_bin=False))
+    run(assemble([INVALID], print_bin=False))
+    run(assemble([PUSH(1), PUSH(2), ADD], print_bin=False), gas_limit=8)
+    with pytest.raises(ExecutionLimitReached):
+        run(assemble([JUMPDEST, PUSH(0), JUMP], print_bin=False), max_steps=100)
+
+    assert registry.halts == {"return": 1, "invalid": 1, "out_of_gas": 1, "limit": 1}
+    # runs off the end after a RETURN opcode's byte, which is only pushed
+    run(assemble([PUSH(RETURN.opcode)], print_bin=False))
+    assert registry.halts["stop"] == 1 and registry.halts["return"] == 1
+    # the out of gas run never entered its only block
+    assert registry.opcodes[ADD.opcode] == 0
+
+
+def test_disabled_records_nothing():
+    registry = metrics.Metrics()
+    run(assemble(COUNTDOWN, print_bin=False))
+    assert registry.executions == 0
+    assert metrics.ACTIVE is None
+
+
+def test_prometheus_text(registry, tmp_path):
+    run(assemble([PUSH(1), PUSH(0x40), MSTORE8, STOP], print_bin=False))
+    registry.track_cache("things", lambda: (3, 1))
+
+    text = registry.to_prometheus()
+    assert "# TYPE yolo_evm_executions_total counter\nyolo_evm_executions_total 1\n" in text
+    assert 'yolo_evm_opcode_executions_total{opcode="MSTORE8"} 1\n' in text
+    assert 'yolo_evm_gas_used_bucket{le="+Inf"} 1\n' in text
+    assert "yolo_evm_peak_memory_bytes 96\n" in text
+    assert 'yolo_evm_halts_total{reason="stop"} 1\n' in text
+    assert 'yolo_evm_cache_hit_ratio{cache="things"} 0.75\n' in text
+    assert 'yolo_evm_cache_hits_total{cache="precompile_ecrecover"}' in text
+
+    path = tmp_path / "yolo_evm.prom"
+    metrics.write_textfile(registry, str(path))
+    assert path.read_text() == text
+
+
+def test_http_endpoint(registry):
+    run(assemble([STOP], print_bin=False))
+    server = metrics.serve(registry, port=0)
+    try:
+        host, port = server.server_address
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+            assert response.headers["Content-Type"] == metrics.CONTENT_TYPE
+            assert "yolo_evm_executions_total 1" in response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
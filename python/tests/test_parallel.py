@@ -0,0 +1,145 @@
+from yolo_evm import parallel
+from yolo_evm.environment import DEFAULT_BLOCK, BlockEnvironment
+from yolo_evm.parallel import execute_block
+from yolo_evm.transaction import InvalidTransaction, Transaction, apply_transaction
+from yolo_evm.WorldState import CODE, STORAGE, WorldState
+
+import pytest
+
+# storage[0] += 1
+COUNTER = bytes.fromhex("600054600101600055")
+# storage[CALLER] = calldata[0:32]
+REGISTRY = bytes.fromhex("6000353355")
+
+COUNTER_ADDRESS = 0xC0
+REGISTRY_ADDRESS = 0xE0
+
+
+def genesis(balance: int = 1000) -> WorldState:
+    state = WorldState()
+    state.set_code(COUNTER_ADDRESS, COUNTER)
+    state.set_code(REGISTRY_ADDRESS, REGISTRY)
+    for sender in range(1, 21):
+        state.set_balance(sender, balance)
+    state.commit()
+    return state
+
+
+def serial(state: WorldState, transactions, block: BlockEnvironment = DEFAULT_BLOCK) -> list:
+    return [apply_transaction(state, tx, block) for tx in transactions]
+
+
+def check_matches_serial(transactions, block: BlockEnvironment = DEFAULT_BLOCK, balance: int = 1000):
+    expected_state = genesis(balance)
+    expected = serial(expected_state, transactions, block)
+
+    state = genesis(balance)
+    results = execute_block(state, transactions, max_workers=2, block=block)
+
+    assert results == expected
+    assert state.data == expected_state.data
+    return state
+
+
+def test_independent_transactions():
+    transactions = [
+        Transaction(sender, REGISTRY_ADDRESS, data=sender.to_bytes(32, "big"))
+        for sender in range(1, 21)
+    ]
+    state = check_matches_serial(transactions)
+    assert state.storage(REGISTRY_ADDRESS, 7) == 7
+
+
+def test_conflicting_transactions_are_reexecuted():
+    transactions = [Transaction(sender, COUNTER_ADDRESS) for sender in range(1, 11)]
+    state = check_matches_serial(transactions)
+    assert state.storage(COUNTER_ADDRESS, 0) == 10
+
+
+def test_value_transfers_chain():
+    """the second transfer is only affordable after the first lands"""
+    transactions = [
+        Transaction(1, 2, value=1000),
+        Transaction(2, 3, value=2000),
+        Transaction(4, REGISTRY_ADDRESS, data=bytes(32)),
+    ]
+    state = check_matches_serial(transactions)
+    assert state.balance(3) == 3000
+
+
+def test_invalid_transaction_fails_the_block():
+    with pytest.raises(InvalidTransaction):
+        execute_block(genesis(), [Transaction(1, 2, value=5000)], max_workers=2)
+
+
+def test_tips_do_not_conflict(monkeypatch):
+    # only re-executions call apply_transaction in this process
+    reexecuted = []
+
+    def counting(*args, **kwargs):
+        reexecuted.append(args[1])
+        return apply_transaction(*args, **kwargs)
+
+    monkeypatch.setattr(parallel, "apply_transaction", counting)
+    block = BlockEnvironment(coinbase=0xC0B, basefee=1)
+    transactions = [
+        Transaction(sender, REGISTRY_ADDRESS, data=sender.to_bytes(32, "big"), gas_limit=50_000, gas_price=2)
+        for sender in range(1, 6)
+    ]
+    state = check_matches_serial(transactions, block, balance=10 ** 6)
+    assert reexecuted == []
+    assert state.balance(0xC0B) == sum(r.gas_used for r in serial(genesis(10 ** 6), transactions, block))
+
+
+def test_reading_the_coinbase_sees_earlier_tips():
+    block = BlockEnvironment(coinbase=3, basefee=1)
+    transactions = [
+        Transaction(1, REGISTRY_ADDRESS, data=bytes(32), gas_limit=50_000, gas_price=2),
+        # pays the coinbase, so has to read its balance
+        Transaction(2, 3, value=10, gas_limit=50_000, gas_price=2),
+    ]
+    check_matches_serial(transactions, block, balance=10 ** 6)
+
+
+def test_block_gas_limit():
+    block = BlockEnvironment(gaslimit=50_000)
+    with pytest.raises(InvalidTransaction):
+        execute_block(genesis(), [Transaction(1, 2, gas_limit=30_000)] * 2, max_workers=2, block=block)
+
+
+def test_consecutive_nonces_from_one_sender():
+    # the second only becomes valid once the first has bumped the nonce
+    transactions = [Transaction(1, REGISTRY_ADDRESS, nonce=i, data=i.to_bytes(32, "big")) for i in range(3)]
+    state = check_matches_serial(transactions)
+    assert state.nonce(1) == 3
+    with pytest.raises(InvalidTransaction):
+        execute_block(genesis(), transactions[1:], max_workers=2)
+
+
+def test_executor_is_reused_across_blocks():
+    blocks = [
+        [Transaction(sender, COUNTER_ADDRESS, nonce=i) for sender in range(1, 6)]
+        + [Transaction(sender, REGISTRY_ADDRESS, nonce=i, data=(i + 1).to_bytes(32, "big")) for sender in range(6, 11)]
+        for i in range(3)
+    ]
+    expected_state = genesis()
+    expected = [serial(expected_state, transactions) for transactions in blocks]
+
+    state = genesis()
+    with parallel.BlockExecutor(state, max_workers=2) as executor:
+        assert [executor.execute_block(transactions) for transactions in blocks] == expected
+        # the next block only ships what this one wrote, not the code
+        assert (STORAGE, COUNTER_ADDRESS, 0) in executor._deltas[1]
+        assert (CODE, COUNTER_ADDRESS) not in executor._deltas[1]
+    assert state.data == expected_state.data
+    assert state.storage(COUNTER_ADDRESS, 0) == 15
+
+
+def test_worker_that_missed_a_block_asks_to_catch_up():
+    parallel._init_worker(genesis().data)
+    try:
+        assert parallel._speculate(2, 1, {}, DEFAULT_BLOCK, []) == 0
+        assert parallel._speculate(2, 0, {(STORAGE, 0xAB, 0): 1}, DEFAULT_BLOCK, []) == []
+        assert parallel._REPLICA.storage(0xAB, 0) == 1
+    finally:
+        parallel._REPLICA, parallel._VERSION = None, 0
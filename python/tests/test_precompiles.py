@@ -0,0 +1,170 @@
+import hashlib
+
+from yolo_evm import bn254, secp256k1
+from yolo_evm.blake2 import IV
+from yolo_evm.ExecutionContext import Calldata, ExecutionContext
+from yolo_evm.keccak import keccak256
+from yolo_evm.opcodes import *
+from yolo_evm.precompiles import BLAKE2F, ECRECOVER, MODEXP, SHA256
+from yolo_evm.runner import execute
+from yolo_evm.WorldState import WorldState
+
+
+def caller_code(address: int, gas: bytes = GAS.to_bytes()) -> bytes:
+    # CALLs address with the calldata as input and returns what it returned,
+    # leaving the CALL's success flag on the stack
+    return assemble([
+        CALLDATASIZE, PUSH(0), PUSH(0), CALLDATACOPY,
+        PUSH(0), PUSH(0), CALLDATASIZE, PUSH(0), PUSH(0), PUSH(address), gas, CALL,
+        RETURNDATASIZE, PUSH(0), PUSH(0), RETURNDATACOPY,
+        RETURNDATASIZE, PUSH(0), RETURN,
+    ], print_bin=False)
+
+
+def call(address: int, data: bytes, gas: bytes = GAS.to_bytes()) -> ExecutionContext:
+    ctx = ExecutionContext(code=caller_code(address, gas), calldata=Calldata(data), gas=10_000_000)
+    execute(ctx)
+    assert ctx.success
+    return ctx
+
+
+def word(x: int) -> bytes:
+    return x.to_bytes(32, "big")
+
+
+def sign(private_key: int, msg_hash: int, k: int):
+    # textbook ECDSA with a fixed nonce, enough to produce test signatures
+    x, y = secp256k1.multiply(secp256k1.G, k)
+    r = x % secp256k1.N
+    s = pow(k, -1, secp256k1.N) * (msg_hash + r * private_key) % secp256k1.N
+    return 27 + (y & 1), r, s
+
+
+def test_keccak256():
+    assert keccak256(b"").hex() == "c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470"
+    assert keccak256(b"hello").hex() == "1c8aff950685c2ed4bc3174f3472287b56d9517b9c948127319a09a7a36deac8"
+    # longer than one block
+    assert len(keccak256(bytes(200))) == 32
+
+
+def test_ecrecover():
+    msg_hash = int.from_bytes(keccak256(b"yolo"), "big")
+    v, r, s = sign(1, msg_hash, k=0xC0FFEE)
+    ctx = call(0x01, word(msg_hash) + word(v) + word(r) + word(s))
+
+    assert ctx.stack.pop() == 1
+    assert ctx.returndata == bytes.fromhex("7E5F4552091A69125d5DfCb7b8C2659029395Bdf").rjust(32, b"\x00")
+
+
+def test_ecrecover_bad_signature_returns_nothing():
+    ctx = call(0x01, word(1) + word(29) + word(1) + word(1))
+    assert ctx.stack.pop() == 1
+    assert ctx.returndata == bytes()
+
+
+def test_hashes_and_identity():
+    data = b"yolo" * 20
+    assert call(0x02, data).returndata == hashlib.sha256(data).digest()
+    assert call(0x03, data).returndata == hashlib.new("ripemd160", data).digest().rjust(32, b"\x00")
+    assert call(0x04, data).returndata == data
+
+
+def test_call_gas_must_cover_the_price():
+    data = bytes(33)
+    assert SHA256.gas(data) == 60 + 12 * 2
+    assert call(0x02, data, gas=PUSH(84)).stack.pop() == 1
+
+    ctx = call(0x02, data, gas=PUSH(83))
+    assert ctx.stack.pop() == 0
+    assert ctx.returndata == bytes()
+
+
+def test_modexp():
+    p = 2 ** 256 - 2 ** 32 - 977
+    data = word(1) + word(32) + word(32) + bytes([3]) + word(p - 1) + word(p)
+    # the EIP-198 example, repriced by EIP-2565
+    assert MODEXP.gas(data) == 1360
+    assert call(0x05, data).returndata == word(1)
+
+    # zero modulus and empty modulus
+    assert MODEXP.run(word(1) + word(1) + word(1) + bytes([2, 3, 0])) == bytes(1)
+    assert MODEXP.run(word(1) + word(1) + word(0) + bytes([2, 3])) == bytes()
+
+
+def test_ecadd_and_ecmul():
+    g = word(1) + word(2)
+    doubled = call(0x06, g + g).returndata
+    assert doubled == call(0x07, g + word(2)).returndata
+    assert doubled == word(bn254.g1_multiply(bn254.G1, 2)[0]) + word(bn254.g1_multiply(bn254.G1, 2)[1])
+
+    # the group order sends G1 to infinity
+    assert call(0x07, g + word(bn254.N)).returndata == bytes(64)
+
+    # not on the curve
+    assert call(0x06, word(1) + word(3) + g).stack.pop() == 0
+
+
+def encode_pair(p, q) -> bytes:
+    (x_re, x_im), (y_re, y_im) = q
+    return word(p[0]) + word(p[1]) + word(x_im) + word(x_re) + word(y_im) + word(y_re)
+
+
+def test_ecpairing():
+    p, q = bn254.G1, bn254.G2
+    assert call(0x08, encode_pair(p, q) + encode_pair(bn254.g1_neg(p), q)).returndata == word(1)
+    assert call(0x08, encode_pair(p, q) + encode_pair(p, q)).returndata == word(0)
+    # the empty product is 1
+    assert call(0x08, bytes()).returndata == word(1)
+
+    ctx = call(0x08, encode_pair(p, q)[:-1])
+    assert ctx.stack.pop() == 0
+
+
+def test_blake2f_matches_hashlib():
+    # EIP-152 test vector 5: one final block of blake2b("abc")
+    h = list(IV)
+    h[0] ^= 0x01010040
+    data = (
+        (12).to_bytes(4, "big")
+        + b"".join(x.to_bytes(8, "little") for x in h)
+        + b"abc".ljust(128, b"\x00")
+        + (3).to_bytes(8, "little") + bytes(8)
+        + b"\x01"
+    )
+    assert BLAKE2F.gas(data) == 12
+    assert call(0x09, data).returndata == hashlib.blake2b(b"abc").digest()
+
+    # the final block flag must be 0 or 1
+    assert call(0x09, data[:-1] + b"\x02").stack.pop() == 0
+
+
+def test_results_are_cached():
+    msg_hash = int.from_bytes(keccak256(b"cached"), "big")
+    v, r, s = sign(7, msg_hash, k=12345)
+    data = word(msg_hash) + word(v) + word(r) + word(s)
+
+    hits = ECRECOVER.run.cache_info().hits
+    first = call(0x01, data).returndata
+    second = call(0x01, data).returndata
+    assert first == second
+    assert ECRECOVER.run.cache_info().hits == hits + 1
+
+
+def test_call_runs_contract_code():
+    # returns 42 as a word, and its own balance
+    callee = assemble([PUSH(42), PUSH(0), MSTORE, SELFBALANCE, PUSH(32), MSTORE, PUSH(64), PUSH(0), RETURN], print_bin=False)
+    state = WorldState()
+    state.set_code(0xCA11EE, callee)
+    state.set_balance(0xCA11E7, 100)
+
+    code = assemble([
+        PUSH(64), PUSH(0), PUSH(0), PUSH(0), PUSH(7), PUSH(0xCA11EE), GAS, CALL,
+        PUSH(64), PUSH(0), RETURN,
+    ], print_bin=False)
+    ctx = ExecutionContext(code=code, gas=100_000, state=state, address=0xCA11E7)
+    execute(ctx)
+
+    assert ctx.success
+    assert ctx.stack.pop() == 1
+    assert ctx.returndata == word(42) + word(7)
+    assert state.balance(0xCA11E7) == 93
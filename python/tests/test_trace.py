@@ -0,0 +1,110 @@
+from yolo_evm.ExecutionContext import ExecutionContext
+from yolo_evm.opcodes import *
+from yolo_evm.runner import execute, run
+from yolo_evm.trace import TraceFile, TraceRecorder, first_divergence, open_steps, read_eip3155, write_eip3155
+from yolo_evm.WorldState import WorldState
+
+FOUR_SQUARED = bytes.fromhex("60048060005b8160125760005360016000f35b8201906001900390600556")
+
+
+def record(code: bytes, gas_limit=10_000) -> TraceRecorder:
+    recorder = TraceRecorder()
+    run(code, gas_limit=gas_limit, tracer=recorder)
+    return recorder
+
+
+def test_steps_rebuild_the_stack():
+    steps = list(record(FOUR_SQUARED).steps())
+
+    assert [s.pc for s in steps[:4]] == [0, 2, 3, 5]
+    assert steps[0].stack == ()
+    assert steps[3].stack == (4, 4, 0)
+    assert all(s.depth == len(s.stack) for s in steps)
+    # the final RETURN sees the result the loop computed, stored at 0
+    assert steps[-1].op == RETURN.opcode
+    assert steps[-1].stack == (4, 0, 1, 0)
+
+
+def test_gas_is_per_step_even_though_blocks_are_charged_whole():
+    steps = list(record(assemble([PUSH(1), PUSH(2), ADD, STOP], print_bin=False), gas_limit=100).steps())
+    assert [s.gas for s in steps] == [100, 97, 94, 91]
+
+
+def test_step_that_runs_out_of_gas_is_traced():
+    # 3 + 3 + 3 gas, with 8 to pay for it
+    recorder = record(assemble([PUSH(1), PUSH(2), ADD], print_bin=False), gas_limit=8)
+    steps = list(recorder.steps())
+    assert [(s.op, s.gas) for s in steps] == [(PUSH1.opcode, 8), (PUSH1.opcode, 5), (ADD.opcode, 2)]
+
+
+def test_memory_writes_are_recorded_as_spans():
+    recorder = record(FOUR_SQUARED)
+    assert list(recorder.mem_offset) == [0]
+    assert bytes(recorder.mem_data) == b"\x10"
+    # written by the MSTORE8
+    assert recorder.op[recorder.mem_step[0]] == MSTORE8.opcode
+
+
+def test_save_and_mmap(tmp_path):
+    recorder = record(FOUR_SQUARED)
+    path = tmp_path / "four.trace"
+    recorder.save(str(path))
+
+    with TraceFile(str(path)) as trace:
+        assert len(trace) == len(recorder)
+        assert list(trace.steps()) == list(recorder.steps())
+
+
+def test_diff_against_eip3155(tmp_path):
+    recorder = record(FOUR_SQUARED)
+    ours = tmp_path / "ours.trace"
+    theirs = tmp_path / "theirs.jsonl"
+    recorder.save(str(ours))
+    write_eip3155(recorder.steps(), str(theirs))
+
+    assert first_divergence(open_steps(str(ours)), open_steps(str(theirs))) is None
+
+    # a reference that disagrees about gas from step 5 on
+    steps = list(read_eip3155(str(theirs)))
+    steps[5:] = [s._replace(gas=s.gas - 1) for s in steps[5:]]
+    divergence = first_divergence(recorder.steps(), steps)
+    assert divergence.index == 5
+    assert divergence.fields == ("gas",)
+
+
+def test_diff_reports_early_end():
+    steps = list(record(FOUR_SQUARED).steps())
+    divergence = first_divergence(steps, steps[:-1])
+    assert divergence.index == len(steps) - 1
+    assert divergence.theirs is None
+
+
+def test_calls_are_traced_one_level_deeper(tmp_path):
+    # stores 0xAA at 0 and returns it, called with 5000 gas
+    callee = assemble([PUSH(0xAA), PUSH(0), MSTORE8, PUSH(1), PUSH(0), RETURN], print_bin=False)
+    state = WorldState()
+    state.set_code(0xCA, callee)
+    code = assemble([
+        PUSH(7),
+        PUSH(1), PUSH(31), PUSH(0), PUSH(0), PUSH(0), PUSH(0xCA), PUSH(5000), CALL,
+        STOP,
+    ], print_bin=False)
+    recorder = TraceRecorder()
+    execute(ExecutionContext(code=code, gas=100_000, state=state), tracer=recorder)
+    steps = list(recorder.steps())
+
+    call = [s.op for s in steps].index(CALL.opcode)
+    inner = steps[call + 1:call + 7]
+    assert [s.call_depth for s in steps] == [1] * (call + 1) + [2] * 6 + [1]
+    assert [s.op for s in inner] == [PUSH1.opcode, PUSH1.opcode, MSTORE8.opcode, PUSH1.opcode, PUSH1.opcode, RETURN.opcode]
+    assert inner[0].stack == () and inner[0].gas == 5000
+    # back in the caller, with the CALL's success flag pushed
+    assert steps[-1].stack == (7, 1)
+    # the callee's write and the returned byte copied into the caller's memory
+    assert [recorder.op[i] for i in recorder.mem_step] == [MSTORE8.opcode, CALL.opcode]
+    assert bytes(recorder.mem_data) == b"\xaa\xaa"
+
+    ours, theirs = tmp_path / "ours.trace", tmp_path / "theirs.jsonl"
+    recorder.save(str(ours))
+    write_eip3155(steps, str(theirs))
+    assert first_divergence(open_steps(str(ours)), open_steps(str(theirs))) is None
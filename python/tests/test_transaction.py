@@ -0,0 +1,144 @@
+import pickle
+
+from yolo_evm.environment import BlockEnvironment
+from yolo_evm.ExecutionContext import Log
+from yolo_evm.opcodes import *
+from yolo_evm.transaction import InvalidTransaction, Transaction, apply_block, apply_transaction, intrinsic_gas
+from yolo_evm.WorldState import WorldState
+
+import pytest
+
+BLOCK = BlockEnvironment(coinbase=0xC0B, timestamp=1_700_000_000, number=18_000_000, difficulty=0x20000, chainid=5, basefee=7)
+
+SENDER = 0x5E
+CONTRACT = 0xC0
+
+
+def returns(*instructions) -> bytes:
+    # runs instructions, each pushing one word, and returns them in order
+    code = []
+    for i, instruction in enumerate(instructions):
+        code += [instruction, PUSH(32 * i), MSTORE]
+    code += [PUSH(32 * len(instructions)), PUSH(0), RETURN]
+    return assemble(code, print_bin=False)
+
+
+def genesis(code: bytes) -> WorldState:
+    state = WorldState()
+    state.set_code(CONTRACT, code)
+    state.set_balance(SENDER, 10 ** 18)
+    state.commit()
+    return state
+
+
+def words(data: bytes) -> list:
+    return [int.from_bytes(data[i:i + 32], "big") for i in range(0, len(data), 32)]
+
+
+def test_environment_opcodes():
+    state = genesis(returns(COINBASE, TIMESTAMP, NUMBER, DIFFICULTY, GASLIMIT, CHAINID, BASEFEE, ORIGIN, GASPRICE))
+    result = apply_transaction(state, Transaction(SENDER, CONTRACT, gas_price=9), BLOCK)
+
+    assert result.success
+    assert words(result.returndata) == [0xC0B, 1_700_000_000, 18_000_000, 0x20000, 30_000_000, 5, 7, SENDER, 9]
+
+
+def test_block_environment_is_immutable():
+    with pytest.raises(AttributeError):
+        BLOCK.number = 1
+    assert pickle.loads(pickle.dumps(BLOCK)) == BLOCK
+
+
+def test_intrinsic_gas_and_fees():
+    state = genesis(bytes())
+    data = bytes([0, 1, 2])
+    assert intrinsic_gas(data) == 21000 + 4 + 2 * 16
+
+    result = apply_transaction(state, Transaction(SENDER, CONTRACT, value=100, data=data, gas_price=10), BLOCK)
+    assert result.gas_used == 21036
+    assert state.balance(SENDER) == 10 ** 18 - 100 - 21036 * 10
+    assert state.balance(CONTRACT) == 100
+    # the base fee is burned, the coinbase only gets the rest
+    assert state.balance(BLOCK.coinbase) == 21036 * 3
+
+    with pytest.raises(InvalidTransaction):
+        apply_transaction(state, Transaction(SENDER, CONTRACT, nonce=1, gas_limit=20999))
+    with pytest.raises(InvalidTransaction):
+        apply_transaction(state, Transaction(SENDER, CONTRACT, nonce=1, gas_price=6), BLOCK)
+    # paying nothing is no way around the base fee
+    with pytest.raises(InvalidTransaction):
+        apply_transaction(state, Transaction(SENDER, CONTRACT, nonce=1), BLOCK)
+
+
+def test_exceptional_halt_uses_all_the_gas():
+    state = genesis(assemble([INVALID], print_bin=False))
+    result = apply_transaction(state, Transaction(SENDER, CONTRACT, gas_limit=100_000, gas_price=10), BLOCK)
+
+    assert not result.success
+    assert result.gas_used == 100_000
+    # nothing is refunded, and the coinbase gets the tip on all of it
+    assert state.balance(SENDER) == 10 ** 18 - 100_000 * 10
+    assert state.balance(BLOCK.coinbase) == 100_000 * 3
+
+    # a stack underflow too
+    state = genesis(assemble([ADD], print_bin=False))
+    transactions = [Transaction(SENDER, CONTRACT, nonce=i, gas_limit=100_000, gas_price=10) for i in range(2)]
+    receipts = list(apply_block(state, BLOCK, transactions))
+    assert [r.cumulative_gas_used for r in receipts] == [100_000, 200_000]
+
+
+def test_nonce_must_match():
+    state = genesis(bytes())
+    tx = Transaction(SENDER, CONTRACT)
+    apply_transaction(state, tx)
+    # a replay, and one from too far ahead
+    with pytest.raises(InvalidTransaction):
+        apply_transaction(state, tx)
+    with pytest.raises(InvalidTransaction):
+        apply_transaction(state, Transaction(SENDER, CONTRACT, nonce=2))
+    assert state.nonce(SENDER) == 1
+
+
+def test_failed_call_returns_the_value():
+    state = genesis(assemble([INVALID], print_bin=False))
+    result = apply_transaction(state, Transaction(SENDER, CONTRACT, value=50))
+
+    assert not result.success
+    assert state.balance(CONTRACT) == 0
+    assert state.balance(SENDER) == 10 ** 18
+    # the nonce bump stays
+    assert state.nonce(SENDER) == 1
+
+
+def test_apply_block_streams_receipts():
+    # LOG1 with topic CALLER and the calldata as data
+    code = assemble([CALLDATASIZE, PUSH(0), PUSH(0), CALLDATACOPY, CALLER, CALLDATASIZE, PUSH(0), LOG1], print_bin=False)
+    state = genesis(code)
+    submitted = []
+
+    def transactions():
+        for i in range(3):
+            tx = Transaction(SENDER, CONTRACT, nonce=i, data=bytes([i + 1]), gas_price=BLOCK.basefee)
+            submitted.append(tx)
+            yield tx
+
+    receipts = apply_block(state, BLOCK, transactions())
+    first = next(receipts)
+    # nothing past the first transaction has been pulled yet
+    assert len(submitted) == 1
+    assert first.status == 1
+    assert first.logs == (Log(CONTRACT, (SENDER,), bytes([1])),)
+
+    rest = list(receipts)
+    assert [r.logs[0].data for r in rest] == [bytes([2]), bytes([3])]
+    assert rest[-1].cumulative_gas_used == sum(r.gas_used for r in [first] + rest)
+    assert state.nonce(SENDER) == 3
+
+
+def test_block_gas_limit():
+    state = genesis(bytes())
+    block = BlockEnvironment(gaslimit=50_000)
+    receipts = apply_block(state, block, [Transaction(SENDER, CONTRACT, nonce=i, gas_limit=30_000) for i in range(2)])
+    assert next(receipts).gas_used == 21000
+    with pytest.raises(InvalidTransaction):
+        next(receipts)
@@ -0,0 +1,93 @@
+from yolo_evm import uint256
+from yolo_evm.uint256 import MASK, SIGN_BIT
+
+import pytest
+
+MINUS_ONE = MASK
+MIN_INT = SIGN_BIT
+
+
+def neg(x: int) -> int:
+    return (-x) & MASK
+
+
+def test_wrapping_arithmetic():
+    assert uint256.add(MASK, 2) == 1
+    assert uint256.sub(3, 5) == neg(2)
+    assert uint256.mul(MASK, 2) == MASK - 1
+
+
+def test_div_is_exact_for_large_values():
+    """float division loses precision long before 2**256"""
+    a = 2 ** 255 + 12345
+    assert uint256.div(a, 3) == a // 3
+    assert uint256.div(a, 0) == 0
+    assert uint256.mod(a, 0) == 0
+
+
+@pytest.mark.parametrize("a,b,expected", [
+    (10, 10, 1),
+    (neg(2), neg(1), 2),
+    (neg(2), 10, 0),
+    (neg(10), 3, neg(3)),
+    (MIN_INT, MINUS_ONE, MIN_INT),  # the one overflowing case
+    (neg(3), 0, 0),
+])
+def test_sdiv(a, b, expected):
+    assert uint256.sdiv(a, b) == expected
+
+
+@pytest.mark.parametrize("a,b,expected", [
+    (10, 3, 1),
+    (neg(8), neg(3), neg(2)),
+    (neg(8), 3, neg(2)),
+    (8, neg(3), 2),
+    (neg(3), 0, 0),
+])
+def test_smod(a, b, expected):
+    assert uint256.smod(a, b) == expected
+
+
+def test_addmod_mulmod_do_not_wrap_first():
+    assert uint256.addmod(MASK, 2, 2) == 1
+    assert uint256.mulmod(MASK, MASK, 12) == 9
+    assert uint256.addmod(1, 2, 0) == 0
+
+
+def test_exp():
+    assert uint256.exp(10, 2) == 100
+    assert uint256.exp(2, 256) == 0
+    assert uint256.exp(3, 2 ** 200) == pow(3, 2 ** 200, 2 ** 256)
+
+
+def test_signextend():
+    assert uint256.signextend(0, 0x7F) == 0x7F
+    assert uint256.signextend(0, 0xFF) == MINUS_ONE
+    assert uint256.signextend(1, 0xAB80FF) == 0x80FF | (MASK ^ 0xFFFF)
+    assert uint256.signextend(31, 0xFF) == 0xFF
+    assert uint256.signextend(2 ** 200, 0xFF) == 0xFF
+
+
+def test_signed_comparisons():
+    assert uint256.slt(MINUS_ONE, 0) == 1
+    assert uint256.slt(0, MINUS_ONE) == 0
+    assert uint256.sgt(neg(2), neg(3)) == 1
+    assert uint256.slt(MIN_INT, MASK >> 1) == 1
+    assert uint256.to_signed(MIN_INT) == -(2 ** 255)
+    assert uint256.to_unsigned(-1) == MINUS_ONE
+
+
+def test_shifts():
+    assert uint256.shl(4, 0xFF << 248) == 0xF << 252
+    assert uint256.shl(2 ** 255, 1) == 0
+    assert uint256.shr(2 ** 255, MASK) == 0
+    assert uint256.sar(4, MASK ^ 0xFF) == MASK ^ 0xF
+    assert uint256.sar(0xFFFFFFFF, MIN_INT) == MINUS_ONE
+    assert uint256.sar(0xFFFFFFFF, MASK >> 4) == 0
+
+
+def test_byte():
+    assert uint256.byte(31, 0xFF) == 0xFF
+    assert uint256.byte(0, MIN_INT) == 0x80
+    assert uint256.byte(32, MASK) == 0
+    assert uint256.byte(2 ** 255, MASK) == 0
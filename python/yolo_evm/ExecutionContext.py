@@ -1,10 +1,25 @@
-from inspect import stack
-from .Memory import Memory
+import copy
+from dataclasses import dataclass
+
+from .constants import MAX_UINT256
+from .environment import DEFAULT_BLOCK, BlockEnvironment
+from .gas import memory_cost
+from .Memory import Memory, ceildiv
 from .Stack import Stack
+from .WorldState import WorldState
 
 class InvalidCalldataAccess(Exception):
     ...
 
+class InvalidReturndataAccess(Exception):
+    ...
+
+class OutOfGas(Exception):
+    ...
+
+class ExecutionLimitReached(Exception):
+    ...
+
 
 
     #Execution contexts (caller, origin, balance, gas limit, etc)
@@ -36,28 +51,134 @@ class Calldata:
 
     def read_word(self,offset:int) ->int:
         return int.from_bytes(
-            [self.read_byte(x) for x in range[offset:offset+32]],"big"
+            [self.read_byte(x) for x in range(offset, offset+32)],"big"
         )
 
+@dataclass(frozen=True)
+class Log:
+    address: int
+    topics: tuple
+    data: bytes
+
 class ExecutionContext:
-    def __init__(self,code=bytes(),stack=None ,pc=0, memory=Memory(),calldata=None) ->None:
+    def __init__(
+        self,
+        code=bytes(),
+        stack=None,
+        pc=0,
+        memory=None,
+        calldata=None,
+        gas=MAX_UINT256,
+        max_memory=None,
+        state=None,
+        address=0,
+        caller=0,
+        value=0,
+        depth=0,
+        block: BlockEnvironment = None,
+        origin=0,
+        gasprice=0,
+        hardfork=None,
+    ) ->None:
         self.code = code
         self.stack = Stack()
-        self.memory = memory
+        self.memory = memory if memory is not None else Memory()
         self.pc = pc
+        self.gas = gas
+        # operator budget on memory size in bytes, separate from gas
+        self.max_memory = max_memory
+        # operator budgets on instructions run and wall-clock, set by
+        # runner.execute and shared by every frame of the call tree
+        self.steps = 0
+        self.max_steps = None
+        self.deadline = None
+        # e.g. a trace.TraceRecorder, which the frames of calls report to too
+        self.tracer = None
         self.stopped = False
+        # how a successful run ended, "stop" or "return", for metrics
+        self.halt = None
+        self.success = True
+        self.reason = None
+        self.jumpdests = set()
         self.returndata = bytes()
         self.calldata = calldata if calldata else Calldata ()
+        self.state = state if state is not None else WorldState()
+        # the account whose code is running, who called it and with how much
+        self.address = address
+        self.caller = caller
+        self.value = value
+        # call depth, 0 for the outermost frame
+        self.depth = depth
+        # output of the last CALL made from this context, for RETURNDATA*
+        self.last_returndata = bytes()
+        # shared by every frame of every transaction in the block
+        self.block = block if block is not None else DEFAULT_BLOCK
+        # the transaction's sender and gas price, the same in every frame
+        self.origin = origin
+        self.gasprice = gasprice
+        # the forks.Hardfork whose rules apply, or its name; the runner
+        # resolves it, None meaning the latest
+        self.hardfork = hardfork
+        # logs emitted by this frame and the calls it made that succeeded
+        self.logs = []
 
     def set_return_data(self,offset:int, length: int) -> None:
+        self.expand_memory(offset, length)
         self.stopped = True
+        self.halt = "return"
         self.returndata= self.memory.load_range(offset,length)
 
+    def consume_gas(self, amount: int) -> None:
+        if amount > self.gas:
+            self.gas = 0
+            raise OutOfGas({"amount": amount})
+        self.gas -= amount
+
+    def expand_memory(self, offset: int, length: int) -> None:
+        # charges for (and budgets) memory growth before anything touches
+        # memory, so an absurd offset fails here instead of allocating
+        if length == 0:
+            return
+        words = ceildiv(offset + length, 32)
+        active_words = self.memory.active_words()
+        if words <= active_words:
+            return
+        self.consume_gas(memory_cost(words) - memory_cost(active_words))
+        if self.max_memory is not None and words * 32 > self.max_memory:
+            raise ExecutionLimitReached({"memory": words * 32, "max_memory": self.max_memory})
+        self.memory._expand_if_needed(offset + length - 1)
+
+    def fork(self) -> "ExecutionContext":
+        """
+        A copy of this context that can run on independently, e.g. down the
+        other side of a JUMPI. The stack is copied and memory is forked
+        copy-on-write; code, calldata and world state are shared, so
+        snapshot the state first if both sides will write to it.
+        """
+        forked = copy.copy(self)
+        forked.stack = Stack(self.stack.max_depth)
+        forked.stack.stack = list(self.stack.stack)
+        forked.memory = self.memory.fork()
+        forked.logs = list(self.logs)
+        return forked
+
     def set_program_counter(self, _pc:int) -> None:
         self.pc = _pc
 
     def stop(self) ->None:
         self.stopped = True
+        self.halt = "stop"
+
+    def fail(self, reason: str) -> None:
+        # exceptional halt: execution ends, nothing is returned and all the
+        # gas that was left is burned
+        self.stopped = True
+        self.gas = 0
+        self.success = False
+        self.reason = reason
+        self.returndata = bytes()
+        self.logs = []
+
     def read_code(self, num_bytes) -> int:
         #returns next num_bytes from code buffer as int and advances pc
 
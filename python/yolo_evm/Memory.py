@@ -1,12 +1,38 @@
+"""
+Byte-addressed EVM memory, stored in fixed-size pages.
+
+A page is allocated the first time something is written to it, and pages
+that were never written read as zeros, so memory that is large but sparse
+(a single MSTORE8 far out) costs one page, not every byte up to it.
+
+fork() makes a copy that shares all of its pages with the original. Shared
+pages are copied on the first write from either side, so a fork costs one
+dict copy and then only the pages that either copy goes on to change.
+"""
 from .constants import MAX_UINT256, MAX_UINT8
 
-ZERO_WORD = [0] * 32
+PAGE_SHIFT = 12
+PAGE_SIZE = 1 << PAGE_SHIFT
+PAGE_MASK = PAGE_SIZE - 1
+
 def ceildiv(a, b):
     return -(a // -b)
 
+class InvalidMemoryAccess(Exception):
+    ...
+
+class InvalidMemoryValue(Exception):
+    ...
+
 class Memory:
     def __init__(self) -> None:
-        self.memory = []
+        # page index -> bytearray(PAGE_SIZE)
+        self.pages = {}
+        # indices of the pages this memory may write in place; the rest
+        # are shared with a fork
+        self._owned = set()
+        # in bytes, always a whole number of words
+        self.size = 0
 
     def store(self, offset: int, value: int) -> None:
         if offset < 0 or offset > MAX_UINT256:
@@ -16,42 +42,99 @@ class Memory:
             raise InvalidMemoryValue({"offset": offset, "value": value})
 
         # expand memory if needed
-        if offset >= len(self.memory):
-            self.memory.extend([0] * (offset - len(self.memory) + 1))
+        self._expand_if_needed(offset)
+
+        self._writable_page(offset >> PAGE_SHIFT)[offset & PAGE_MASK] = value
+
+    def store_range(self, offset: int, data: bytes) -> None:
+        if not data:
+            return
+        if offset < 0 or offset + len(data) - 1 > MAX_UINT256:
+            raise InvalidMemoryAccess({"offset": offset, "length": len(data)})
 
-        self.memory[offset] = value
+        self._expand_if_needed(offset + len(data) - 1)
+
+        view = memoryview(data)
+        end = offset + len(data)
+        while offset < end:
+            start = offset & PAGE_MASK
+            chunk = min(PAGE_SIZE - start, end - offset)
+            self._writable_page(offset >> PAGE_SHIFT)[start:start + chunk] = view[:chunk]
+            view = view[chunk:]
+            offset += chunk
 
     def load(self, offset: int) -> int:
         if offset < 0:
             raise InvalidMemoryAccess({"offset": offset})
 
-        if offset >= len(self.memory):
-            return 0
+        page = self.pages.get(offset >> PAGE_SHIFT)
+        return page[offset & PAGE_MASK] if page is not None else 0
+
+    def load_range(self, offset, length) -> bytes:
+        # reading past the end of concrete memory, or an unwritten page, gives zeros
+        if offset < 0:
+            raise InvalidMemoryAccess({"offset": offset})
 
-        return self.memory[offset]
+        end = offset + length
+        first, last = offset >> PAGE_SHIFT, (end - 1) >> PAGE_SHIFT
+        if length and first == last:
+            page = self.pages.get(first)
+            start = offset & PAGE_MASK
+            return bytes(page[start:start + length]) if page is not None else bytes(length)
+
+        result = bytearray(length)
+        pages = self.pages
+        position = offset
+        while position < end:
+            start = position & PAGE_MASK
+            chunk = min(PAGE_SIZE - start, end - position)
+            page = pages.get(position >> PAGE_SHIFT)
+            if page is not None:
+                result[position - offset:position - offset + chunk] = page[start:start + chunk]
+            position += chunk
+        return bytes(result)
 
-    def load_range(self,offset, length):
-            #we could use a slice here, but this lets us get 0 bytes if we read past the end of concrete memory 
-        return bytes(self.load(x) for x in range(offset, offset+length))
-    
     def active_words(self)->int:
-        return len(self.memory)
-    
+        return self.size // 32
+
+    def fork(self) -> "Memory":
+        """
+        A copy of this memory. Pages are shared until one side writes to
+        them, so forking costs nothing per byte.
+        """
+        forked = Memory()
+        forked.pages = dict(self.pages)
+        forked.size = self.size
+        # every page is now shared, so neither side may write in place
+        self._owned.clear()
+        return forked
+
+    def _writable_page(self, index: int) -> bytearray:
+        if index in self._owned:
+            return self.pages[index]
+        page = self.pages.get(index)
+        page = bytearray(page) if page is not None else bytearray(PAGE_SIZE)
+        self.pages[index] = page
+        self._owned.add(index)
+        return page
+
     def _expand_if_needed(self, offset: int) -> None:
-        if offset < len(self.memory):
+        # only the size grows; pages appear when they are written
+        if offset < self.size:
             return
 
-        active_words_after = max(self.active_words(), ceildiv(offset + 1, 32))
-
-        self.memory.extend(ZERO_WORD * (active_words_after - self.active_words()))
-
-        assert len(self.memory) % 32 == 0
+        self.size = 32 * ceildiv(offset + 1, 32)
 
     def __len__(self) -> int:
-        return len(self.memory)
+        return self.size
 
     def __str__(self) -> str:
-        return str(self.memory)
+        # the pages that were written, each as "offset: hex"; unwritten
+        # memory is zeros and is left out, however large the size
+        return ", ".join(
+            f"0x{index << PAGE_SHIFT:x}: {self.pages[index][:self.size - (index << PAGE_SHIFT)].hex()}"
+            for index in sorted(self.pages)
+        )
 
     def __repr__(self) -> str:
-        return str(self)
\ No newline at end of file
+        return f"Memory(size={self.size}, pages={sorted(self.pages)})"
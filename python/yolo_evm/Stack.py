@@ -1,4 +1,3 @@
-from sre_constants import MAX_REPEAT
 from .constants import MAX_STACK_DEPTH, MAX_UINT256
 
 class Stack:
@@ -8,7 +7,7 @@ class Stack:
 
     
     def push(self, item: int) -> None:
-        if item < 0 or item > 2**256 - 1:
+        if item < 0 or item > MAX_UINT256:
             raise InvalidStackItem({"item": item})
 
         if (len(self.stack) + 1) > self.max_depth:
@@ -22,6 +21,19 @@ class Stack:
 
         return self.stack.pop()
 
+    def peek(self, i: int) -> int:
+        # i=0 is the top of the stack
+        if len(self.stack) <= i:
+            raise StackUnderflow()
+
+        return self.stack[-i - 1]
+
+    def swap(self, i: int) -> None:
+        if len(self.stack) <= i:
+            raise StackUnderflow()
+
+        self.stack[-1], self.stack[-i - 1] = self.stack[-i - 1], self.stack[-1]
+
 
 class StackUnderflow(Exception):
     ...
@@ -0,0 +1,114 @@
+"""
+Account state: balances, nonces, code and storage.
+
+State is one flat dict keyed by tuples, (BALANCE, address), (NONCE, address),
+(CODE, address), (STORAGE, address, slot) and (TRANSIENT, address, slot),
+with absent keys reading as zero (or empty code). Keeping every piece of state addressable by a single
+key is what lets StateOverlay record exact read and write sets.
+
+Writes are journaled so a failed call can be rolled back to a snapshot.
+Transient storage (EIP-1153) is journaled like the rest, and is cleared
+at the end of every transaction.
+"""
+
+BALANCE = 0
+NONCE = 1
+CODE = 2
+STORAGE = 3
+TRANSIENT = 4
+
+_MISSING = object()
+
+
+def _default(key: tuple):
+    return bytes() if key[0] == CODE else 0
+
+
+class WorldState:
+    def __init__(self, data: dict = None) -> None:
+        self.data = data if data is not None else {}
+        self.journal = []
+        # every transient key written, so clearing them needs no scan
+        self._transient = set()
+
+    def get(self, key: tuple):
+        value = self.data.get(key, _MISSING)
+        return _default(key) if value is _MISSING else value
+
+    def set(self, key: tuple, value) -> None:
+        self.journal.append((key, self.data.get(key, _MISSING)))
+        self.data[key] = value
+
+    def snapshot(self) -> int:
+        return len(self.journal)
+
+    def revert(self, snapshot: int) -> None:
+        journal, data = self.journal, self.data
+        while len(journal) > snapshot:
+            key, old = journal.pop()
+            if old is _MISSING:
+                del data[key]
+            else:
+                data[key] = old
+
+    def commit(self) -> None:
+        # forget the journal, the writes can no longer be rolled back
+        self.journal.clear()
+
+    def balance(self, address: int) -> int:
+        return self.get((BALANCE, address))
+
+    def set_balance(self, address: int, value: int) -> None:
+        self.set((BALANCE, address), value)
+
+    def nonce(self, address: int) -> int:
+        return self.get((NONCE, address))
+
+    def set_nonce(self, address: int, value: int) -> None:
+        self.set((NONCE, address), value)
+
+    def code(self, address: int) -> bytes:
+        return self.get((CODE, address))
+
+    def set_code(self, address: int, code: bytes) -> None:
+        self.set((CODE, address), code)
+
+    def storage(self, address: int, slot: int) -> int:
+        return self.get((STORAGE, address, slot))
+
+    def set_storage(self, address: int, slot: int, value: int) -> None:
+        self.set((STORAGE, address, slot), value)
+
+    def transient_storage(self, address: int, slot: int) -> int:
+        return self.get((TRANSIENT, address, slot))
+
+    def set_transient_storage(self, address: int, slot: int, value: int) -> None:
+        key = (TRANSIENT, address, slot)
+        self._transient.add(key)
+        self.set(key, value)
+
+    def clear_transient_storage(self) -> None:
+        # not journaled: this happens after the transaction is committed
+        for key in self._transient:
+            self.data.pop(key, None)
+        self._transient.clear()
+
+
+class StateOverlay(WorldState):
+    """
+    Buffers writes on top of a base state and records which base keys were
+    read, so the base is never touched. `data` ends up holding exactly the
+    write set.
+    """
+
+    def __init__(self, base: WorldState) -> None:
+        super().__init__()
+        self.base = base
+        self.reads = set()
+
+    def get(self, key: tuple):
+        value = self.data.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        self.reads.add(key)
+        return self.base.get(key)
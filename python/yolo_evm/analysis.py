@@ -0,0 +1,59 @@
+"""
+Static analysis of a code buffer, done once before it runs.
+
+The runner works a basic block at a time. A block starts at pc 0, at every
+JUMPDEST and right after every instruction that does not simply fall
+through, so once a block is entered all of its instructions run unless one
+of them fails. That lets budgets and static gas be charged once per block
+instead of once per instruction.
+"""
+from .forks import Hardfork, get_hardfork
+from .opcodes import JUMPDEST, PUSH1, PUSH32
+
+# bumped whenever the rules below change where blocks end or what they
+# cost, so stored analyses (see corpus.py) can tell they are stale
+ANALYSIS_VERSION = 2
+
+
+class CodeAnalysis:
+    def __init__(self, jumpdests: frozenset, blocks: dict, hardfork: Hardfork = None) -> None:
+        self.jumpdests = jumpdests
+        # block start pc -> (number of instructions, static gas)
+        self.blocks = blocks
+        # block boundaries and gas depend on the rules the code was analysed under
+        self.hardfork = get_hardfork(hardfork)
+
+
+def analyse(code: bytes, hardfork: Hardfork = None) -> CodeAnalysis:
+    hardfork = get_hardfork(hardfork)
+    jumpdests = set()
+    blocks = {}
+    gas_table = hardfork.gas_table
+    terminators = hardfork.block_terminators
+    jumpdest, push1, push32 = JUMPDEST.opcode, PUSH1.opcode, PUSH32.opcode
+
+    start, count, gas = 0, 0, 0
+    i = 0
+    while i < len(code):
+        op = code[i]
+        if op == jumpdest:
+            jumpdests.add(i)
+            if count:
+                blocks[start] = (count, gas)
+            start, count, gas = i, 0, 0
+
+        count += 1
+        gas += gas_table[op]
+
+        if push1 <= op <= push32:
+            i += op - push1 + 1
+        i += 1
+
+        if op in terminators:
+            blocks[start] = (count, gas)
+            start, count, gas = i, 0, 0
+
+    if count:
+        blocks[start] = (count, gas)
+
+    return CodeAnalysis(frozenset(jumpdests), blocks, hardfork)
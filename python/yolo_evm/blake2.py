@@ -0,0 +1,61 @@
+"""
+The BLAKE2b compression function F, exposed on its own by the BLAKE2F
+precompile (EIP-152) with a caller-chosen number of rounds. hashlib only
+offers whole hashes, so F is written out here.
+"""
+from typing import List
+
+MASK64 = 2 ** 64 - 1
+
+IV = [
+    0x6A09E667F3BCC908, 0xBB67AE8584CAA73B, 0x3C6EF372FE94F82B, 0xA54FF53A5F1D36F1,
+    0x510E527FADE682D1, 0x9B05688C2B3E6C1F, 0x1F83D9ABFB41BD6B, 0x5BE0CD19137E2179,
+]
+
+SIGMA = [
+    [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15],
+    [14, 10, 4, 8, 9, 15, 13, 6, 1, 12, 0, 2, 11, 7, 5, 3],
+    [11, 8, 12, 0, 5, 2, 15, 13, 10, 14, 3, 6, 7, 1, 9, 4],
+    [7, 9, 3, 1, 13, 12, 11, 14, 2, 6, 5, 10, 4, 0, 15, 8],
+    [9, 0, 5, 7, 2, 4, 10, 15, 14, 1, 11, 12, 6, 8, 3, 13],
+    [2, 12, 6, 10, 0, 11, 8, 3, 4, 13, 7, 5, 15, 14, 1, 9],
+    [12, 5, 1, 15, 14, 13, 4, 10, 0, 7, 6, 3, 9, 2, 8, 11],
+    [13, 11, 7, 14, 12, 1, 3, 9, 5, 0, 15, 4, 8, 6, 2, 10],
+    [6, 15, 14, 9, 11, 3, 0, 8, 12, 2, 13, 7, 1, 4, 10, 5],
+    [10, 2, 8, 4, 7, 6, 1, 5, 15, 11, 9, 14, 3, 12, 13, 0],
+]
+
+# (a, b, c, d) lanes of the column then diagonal G applications
+MIX = [(0, 4, 8, 12), (1, 5, 9, 13), (2, 6, 10, 14), (3, 7, 11, 15),
+       (0, 5, 10, 15), (1, 6, 11, 12), (2, 7, 8, 13), (3, 4, 9, 14)]
+
+
+def compress(rounds: int, h: List[int], m: List[int], t: List[int], final: bool) -> List[int]:
+    v = h[:] + IV[:]
+    v[12] ^= t[0]
+    v[13] ^= t[1]
+    if final:
+        v[14] ^= MASK64
+
+    for r in range(rounds):
+        s = SIGMA[r % 10]
+        for i, (a, b, c, d) in enumerate(MIX):
+            x, y = m[s[2 * i]], m[s[2 * i + 1]]
+            va, vb, vc, vd = v[a], v[b], v[c], v[d]
+
+            va = (va + vb + x) & MASK64
+            vd ^= va
+            vd = ((vd >> 32) | (vd << 32)) & MASK64
+            vc = (vc + vd) & MASK64
+            vb ^= vc
+            vb = ((vb >> 24) | (vb << 40)) & MASK64
+            va = (va + vb + y) & MASK64
+            vd ^= va
+            vd = ((vd >> 16) | (vd << 48)) & MASK64
+            vc = (vc + vd) & MASK64
+            vb ^= vc
+            vb = ((vb >> 63) | (vb << 1)) & MASK64
+
+            v[a], v[b], v[c], v[d] = va, vb, vc, vd
+
+    return [h[i] ^ v[i] ^ v[i + 8] for i in range(8)]
@@ -0,0 +1,280 @@
+"""
+The alt_bn128 (BN254) curve behind the ECADD, ECMUL and ECPAIRING
+precompiles, in plain Python.
+
+G1 points are pairs of ints, G2 points pairs of Fq2 elements, with None as
+the point at infinity. The pairing is the optimal ate pairing: the Miller
+loop runs on G2 points over Fq2 and evaluates each line function straight
+into Fq12, so the only Fq12 work is multiplication. Vertical lines are
+skipped; they land in Fq6 and the final exponentiation sends them to 1.
+"""
+import functools
+from typing import Optional, Tuple
+
+P = 21888242871839275222246405745257275088696311157297823662689037894645226208583
+N = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+ATE_LOOP_COUNT = 29793968203157093288
+LOG_ATE_LOOP_COUNT = 63
+
+B1 = 3
+
+Fq2 = Tuple[int, int]
+G1Point = Optional[Tuple[int, int]]
+G2Point = Optional[Tuple[Fq2, Fq2]]
+
+
+# Fq2 = Fq[i] / (i^2 + 1), elements are (real, imaginary)
+def fq2_add(a: Fq2, b: Fq2) -> Fq2:
+    return ((a[0] + b[0]) % P, (a[1] + b[1]) % P)
+
+
+def fq2_sub(a: Fq2, b: Fq2) -> Fq2:
+    return ((a[0] - b[0]) % P, (a[1] - b[1]) % P)
+
+
+def fq2_mul(a: Fq2, b: Fq2) -> Fq2:
+    return ((a[0] * b[0] - a[1] * b[1]) % P, (a[0] * b[1] + a[1] * b[0]) % P)
+
+
+def fq2_scale(a: Fq2, k: int) -> Fq2:
+    return (a[0] * k % P, a[1] * k % P)
+
+
+def fq2_inv(a: Fq2) -> Fq2:
+    norm_inv = pow(a[0] * a[0] + a[1] * a[1], -1, P)
+    return (a[0] * norm_inv % P, -a[1] * norm_inv % P)
+
+
+def fq2_neg(a: Fq2) -> Fq2:
+    return (-a[0] % P, -a[1] % P)
+
+
+FQ2_ZERO = (0, 0)
+FQ2_ONE = (1, 0)
+# G2 lives on the twist y^2 = x^3 + 3 / (9 + i)
+B2 = fq2_mul((3, 0), fq2_inv((9, 1)))
+
+G1 = (1, 2)
+G2 = (
+    (
+        10857046999023057135944570762232829481370756359578518086990519993285655852781,
+        11559732032986387107991004021392285783925812861821192530917403151452391805634,
+    ),
+    (
+        8495653923123431417604973247489272438418190587263600148770280649306958101930,
+        4082367875863433681332203403145435568316851327593401208105741076214120093531,
+    ),
+)
+
+
+# G1
+def g1_on_curve(pt: G1Point) -> bool:
+    if pt is None:
+        return True
+    x, y = pt
+    return (y * y - x * x * x - B1) % P == 0
+
+
+def g1_add(p1: G1Point, p2: G1Point) -> G1Point:
+    if p1 is None:
+        return p2
+    if p2 is None:
+        return p1
+    (x1, y1), (x2, y2) = p1, p2
+    if x1 == x2:
+        if (y1 + y2) % P == 0:
+            return None
+        m = 3 * x1 * x1 * pow(2 * y1, -1, P) % P
+    else:
+        m = (y2 - y1) * pow(x2 - x1, -1, P) % P
+    x3 = (m * m - x1 - x2) % P
+    return (x3, (m * (x1 - x3) - y1) % P)
+
+
+def g1_multiply(pt: G1Point, k: int) -> G1Point:
+    result = None
+    addend = pt
+    while k:
+        if k & 1:
+            result = g1_add(result, addend)
+        addend = g1_add(addend, addend)
+        k >>= 1
+    return result
+
+
+def g1_neg(pt: G1Point) -> G1Point:
+    return None if pt is None else (pt[0], -pt[1] % P)
+
+
+# G2
+def g2_on_curve(pt: G2Point) -> bool:
+    if pt is None:
+        return True
+    x, y = pt
+    return fq2_sub(fq2_mul(y, y), fq2_add(fq2_mul(fq2_mul(x, x), x), B2)) == FQ2_ZERO
+
+
+def _g2_slope(p1: G2Point, p2: G2Point) -> Optional[Fq2]:
+    # None for a vertical line
+    (x1, y1), (x2, y2) = p1, p2
+    if x1 == x2:
+        if y1 != y2 or y1 == FQ2_ZERO:
+            return None
+        return fq2_mul(fq2_scale(fq2_mul(x1, x1), 3), fq2_inv(fq2_scale(y1, 2)))
+    return fq2_mul(fq2_sub(y2, y1), fq2_inv(fq2_sub(x2, x1)))
+
+
+def _g2_add_with_slope(p1: G2Point, p2: G2Point, m: Optional[Fq2]) -> G2Point:
+    if m is None:
+        return None
+    (x1, y1), (x2, _) = p1, p2
+    x3 = fq2_sub(fq2_sub(fq2_mul(m, m), x1), x2)
+    return (x3, fq2_sub(fq2_mul(m, fq2_sub(x1, x3)), y1))
+
+
+def g2_add(p1: G2Point, p2: G2Point) -> G2Point:
+    if p1 is None:
+        return p2
+    if p2 is None:
+        return p1
+    return _g2_add_with_slope(p1, p2, _g2_slope(p1, p2))
+
+
+def g2_multiply(pt: G2Point, k: int) -> G2Point:
+    result = None
+    addend = pt
+    while k:
+        if k & 1:
+            result = g2_add(result, addend)
+        addend = g2_add(addend, addend)
+        k >>= 1
+    return result
+
+
+def g2_neg(pt: G2Point) -> G2Point:
+    return None if pt is None else (pt[0], fq2_neg(pt[1]))
+
+
+# Fq12 = Fq[w] / (w^12 - 18 w^6 + 82), elements are 12 coefficients, lowest
+# first. Here w^6 = 9 + i, so Fq2 sits inside as a + bi -> (a - 9b) + b w^6.
+FQ12_ONE = (1,) + (0,) * 11
+
+
+def fq12_mul(a: tuple, b: tuple) -> tuple:
+    product = [0] * 23
+    for i, ai in enumerate(a):
+        if ai:
+            for j, bj in enumerate(b):
+                product[i + j] += ai * bj
+    # w^12 = 18 w^6 - 82
+    for k in range(22, 11, -1):
+        top = product[k]
+        if top:
+            product[k - 6] += 18 * top
+            product[k - 12] -= 82 * top
+    return tuple(x % P for x in product[:12])
+
+
+def fq12_pow(a: tuple, e: int) -> tuple:
+    result = FQ12_ONE
+    for bit in bin(e)[2:]:
+        result = fq12_mul(result, result)
+        if bit == "1":
+            result = fq12_mul(result, a)
+    return result
+
+
+def _embed(a: Fq2, shift: int, coeffs: list) -> None:
+    # adds a * w^shift into coeffs, for shift < 6
+    coeffs[shift] += a[0] - 9 * a[1]
+    coeffs[shift + 6] += a[1]
+
+
+def _twist(pt: G2Point) -> Tuple[tuple, tuple]:
+    # (x, y) -> (x w^2, y w^3) on y^2 = x^3 + 3 over Fq12
+    x, y = [0] * 12, [0] * 12
+    _embed(pt[0], 2, x)
+    _embed(pt[1], 3, y)
+    return tuple(c % P for c in x), tuple(c % P for c in y)
+
+
+def _untwist(x: tuple, y: tuple) -> G2Point:
+    # inverse of _twist: x only has w^2 and w^8 terms, y w^3 and w^9
+    return ((x[2] + 9 * x[8]) % P, x[8]), ((y[3] + 9 * y[9]) % P, y[9])
+
+
+@functools.lru_cache(maxsize=None)
+def _frobenius_coefficients() -> Tuple[Fq2, Fq2]:
+    # (a w^2)^p = conj(a) w^2p and w^2p = w^2 * (an Fq2 constant), likewise
+    # for w^3p. Computed on first use rather than at import.
+    w2, w3 = _twist((FQ2_ONE, FQ2_ONE))
+    return _untwist(fq12_pow(w2, P), fq12_pow(w3, P))
+
+
+def _frobenius(pt: G2Point) -> G2Point:
+    # the p-power Frobenius of the twisted point, brought back to the twist;
+    # on Fq2 the Frobenius is conjugation
+    gamma_x, gamma_y = _frobenius_coefficients()
+    (x, y) = pt
+    return fq2_mul((x[0], -x[1] % P), gamma_x), fq2_mul((y[0], -y[1] % P), gamma_y)
+
+
+def _line(r: G2Point, m: Optional[Fq2], p: Tuple[int, int]) -> Optional[tuple]:
+    """
+    The line through r with slope m (both on the twist), evaluated at the
+    G1 point p. Twisting turns the slope into m w, so the line is
+    -y_p + (m x_p) w + (y_r - m x_r) w^3.
+    """
+    if m is None:
+        return None
+    coeffs = [0] * 12
+    coeffs[0] = -p[1]
+    _embed(fq2_scale(m, p[0]), 1, coeffs)
+    _embed(fq2_sub(r[1], fq2_mul(m, r[0])), 3, coeffs)
+    return tuple(c % P for c in coeffs)
+
+
+def _step(f: tuple, r: G2Point, s: G2Point, p: Tuple[int, int]) -> Tuple[tuple, G2Point]:
+    m = _g2_slope(r, s)
+    line = _line(r, m, p)
+    if line is not None:
+        f = fq12_mul(f, line)
+    return f, _g2_add_with_slope(r, s, m)
+
+
+def miller_loop(q: G2Point, p: G1Point) -> tuple:
+    if q is None or p is None:
+        return FQ12_ONE
+
+    r = q
+    f = FQ12_ONE
+    for i in range(LOG_ATE_LOOP_COUNT, -1, -1):
+        f = fq12_mul(f, f)
+        f, r = _step(f, r, r, p)
+        if ATE_LOOP_COUNT & (1 << i):
+            f, r = _step(f, r, q, p)
+
+    q1 = _frobenius(q)
+    nq2 = g2_neg(_frobenius(q1))
+    f, r = _step(f, r, q1, p)
+    f, r = _step(f, r, nq2, p)
+    return f
+
+
+FINAL_EXPONENT = (P ** 12 - 1) // N
+
+
+def final_exponentiate(f: tuple) -> tuple:
+    return fq12_pow(f, FINAL_EXPONENT)
+
+
+def pairing_check(pairs) -> bool:
+    """
+    True if the product of e(p, q) over the (p, q) pairs is 1. The Miller
+    loops are multiplied first, so there is one final exponentiation.
+    """
+    f = FQ12_ONE
+    for p, q in pairs:
+        f = fq12_mul(f, miller_loop(q, p))
+    return final_exponentiate(f) == FQ12_ONE
@@ -0,0 +1,160 @@
+"""
+Checkpoints of a running ExecutionContext, and gas estimation built on them.
+
+Until code reads how much gas it has left, with GAS or by making a CALL
+(which forwards a share of it), a run under a lower gas limit does exactly
+what a run under a higher one did, with less gas in hand, up to the point
+where it runs out. So a checkpoint one run takes at a basic-block boundary
+can be resumed under any gas limit that covers the gas used up to it,
+instead of running the code again from the start.
+
+A checkpoint is a fork of the context (pc, stack, copy-on-write memory,
+logs, gas) and the world state's journal position. Nothing is recorded
+past the first block that reads the gas left: a checkpoint from there on
+would only fit the exact limit it was taken under.
+
+estimate_gas binary searches for the lowest gas limit that succeeds, and
+every probe resumes from the block that first reads the gas left instead
+of starting over. Code that never reads the gas left needs no probe at
+all.
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .analysis import analyse
+from .environment import DEFAULT_BLOCK, BlockEnvironment
+from .ExecutionContext import Calldata, ExecutionContext
+from .forks import get_hardfork
+from .opcodes import CALL, GAS, PUSH1, PUSH32
+from .runner import execute
+from .WorldState import StateOverlay, WorldState
+
+# instructions whose effect depends on the gas left
+READS_GAS = frozenset([GAS.opcode, CALL.opcode])
+
+
+class GasEstimationFailed(Exception):
+    ...
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    # a fork of the context at the start of a block, never run itself
+    context: ExecutionContext
+    journal: int
+    gas_used: int
+
+    def fits(self, gas_limit: int) -> bool:
+        return gas_limit >= self.gas_used
+
+
+def _last_opcode(code: bytes, start: int, count: int) -> int:
+    pc = start
+    for _ in range(count - 1):
+        op = code[pc]
+        pc += 1 + (op - PUSH1.opcode + 1 if PUSH1.opcode <= op <= PUSH32.opcode else 0)
+    return code[pc]
+
+
+class CheckpointRecorder:
+    """
+    Passed to runner.execute, takes a checkpoint at the block that first
+    reads the gas left, where it stops. With an interval it also takes one
+    at the first block and at every `interval` blocks after it, for resuming
+    below the gas that block was reached with.
+    """
+
+    def __init__(self, gas_limit: int, interval: int = None) -> None:
+        self.gas_limit = gas_limit
+        self.interval = interval
+        self.checkpoints: List[Checkpoint] = []
+        # whether the run read the gas left, so that a lower limit could
+        # have taken it down another path
+        self.reads_gas = False
+        self._blocks = 0
+
+    def record(self, context: ExecutionContext, start: int, count: int) -> None:
+        if self.reads_gas:
+            return
+        self.reads_gas = _last_opcode(context.code, start, count) in READS_GAS
+        if self.reads_gas or (self.interval is not None and self._blocks % self.interval == 0):
+            self.checkpoints.append(Checkpoint(context.fork(), context.state.snapshot(), self.gas_limit - context.gas))
+        self._blocks += 1
+
+    def latest(self, gas_limit: int) -> Optional[Checkpoint]:
+        for checkpoint in reversed(self.checkpoints):
+            if checkpoint.fits(gas_limit):
+                return checkpoint
+        return None
+
+    def resume(self, checkpoint: Checkpoint, gas_limit: int) -> ExecutionContext:
+        """
+        A context at the checkpoint with gas_limit's worth of gas, ready to
+        execute. The world state is rolled back to the checkpoint, and the
+        checkpoints after it are dropped since their state is gone.
+        """
+        del self.checkpoints[self.checkpoints.index(checkpoint) + 1:]
+        context = checkpoint.context.fork()
+        context.state.revert(checkpoint.journal)
+        context.gas = gas_limit - checkpoint.gas_used
+        return context
+
+
+def estimate_gas(
+    code: bytes,
+    calldata: bytes = bytes(),
+    block: BlockEnvironment = DEFAULT_BLOCK,
+    state: WorldState = None,
+    address: int = 0,
+    caller: int = 0,
+    value: int = 0,
+    gas_cap: int = None,
+) -> int:
+    """
+    The lowest gas limit under which code, called with calldata, succeeds.
+    It is execution gas only: a transaction also pays
+    transaction.intrinsic_gas(calldata) on top.
+
+    state is only read, every write goes to an overlay. gas_cap defaults
+    to the block's gas limit, and raises GasEstimationFailed if code fails
+    even with that much. Like eth_estimateGas, this takes it that less gas
+    than the run under the cap used is never enough.
+    """
+    gas_cap = block.gaslimit if gas_cap is None else gas_cap
+    hardfork = get_hardfork(block.hardfork)
+    analysis = analyse(code, hardfork)
+    context = ExecutionContext(
+        code=code,
+        calldata=Calldata(calldata),
+        gas=gas_cap,
+        state=StateOverlay(state if state is not None else WorldState()),
+        address=address,
+        caller=caller,
+        value=value,
+        block=block,
+        origin=caller,
+        hardfork=hardfork,
+    )
+    recorder = CheckpointRecorder(gas_cap)
+    execute(context, analysis=analysis, checkpoints=recorder)
+    if not context.success:
+        raise GasEstimationFailed({"gas_cap": gas_cap, "reason": context.reason})
+
+    gas_used = gas_cap - context.gas
+    if not recorder.reads_gas:
+        # every lower limit runs the same way until it runs out
+        return gas_used
+
+    # every probe is for at least gas_used, which covers the gas used up to
+    # the block that first read the gas left: gas only ever comes back from
+    # a CALL less than what was spent on it
+    lo, hi = gas_used - 1, gas_cap
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        probe = recorder.resume(recorder.latest(mid), mid)
+        execute(probe, analysis=analysis)
+        if probe.success:
+            hi = mid
+        else:
+            lo = mid
+    return hi
@@ -0,0 +1,288 @@
+"""
+Binary bytecode corpus, for analysing and replaying many deployed contracts.
+
+A corpus file maps addresses to code. Identical bytecode is stored once,
+keyed by its digest, together with its precomputed CodeAnalysis (jump
+destinations and basic blocks), so opening a corpus never hex-decodes or
+re-analyses anything:
+
+    with Corpus("mainnet.corpus") as corpus:
+        for contract in corpus:
+            run(contract.code, analysis=contract.analysis)
+
+contract.code is a memoryview straight into the memory-mapped file, and
+contracts sharing code share one CodeAnalysis object.
+
+Blocks and their gas depend on the hardfork and on the analysis rules, so
+the header records the fork a corpus was analysed under and
+analysis.ANALYSIS_VERSION. Opening it for another fork, or with newer
+rules, analyses each code afresh instead of trusting the stored blocks.
+
+The digest is BLAKE2b-256 rather than keccak256 (the EVM code hash): it is
+only used for deduplication, and hashlib computes it natively.
+
+Building a corpus analyses each unique code once, on a process pool:
+
+    python -m yolo_evm.corpus build out.corpus contracts.txt
+
+where each line of contracts.txt is "<address hex> <code hex>".
+"""
+import argparse
+import functools
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Tuple
+
+from .analysis import ANALYSIS_VERSION, CodeAnalysis, analyse
+from .forks import Hardfork, get_hardfork
+
+MAGIC = b"YCOR"
+VERSION = 2
+
+# magic, version, analysis version, contracts, unique codes, hardfork name,
+# then section offsets
+HEADER = struct.Struct("<4sHHII32sQQQQ")
+# address, index of its code
+CONTRACT = struct.Struct("<20sI")
+# digest, code offset, code length, analysis offset, analysis length
+CODE = struct.Struct("<32sQIQI")
+# jumpdests, blocks
+ANALYSIS = struct.Struct("<II")
+
+
+class CorpusFormatError(Exception):
+    ...
+
+
+def code_digest(code) -> bytes:
+    return hashlib.blake2b(code, digest_size=32).digest()
+
+
+def pack_analysis(code, hardfork: Hardfork = None) -> bytes:
+    analysis = analyse(code, hardfork)
+    starts = sorted(analysis.blocks)
+    jumpdests = array("I", sorted(analysis.jumpdests))
+    counts = array("I", (analysis.blocks[s][0] for s in starts))
+    gas = array("Q", (analysis.blocks[s][1] for s in starts))
+    return b"".join([
+        ANALYSIS.pack(len(jumpdests), len(starts)),
+        jumpdests.tobytes(),
+        array("I", starts).tobytes(),
+        counts.tobytes(),
+        gas.tobytes(),
+    ])
+
+
+def unpack_analysis(data, hardfork: Hardfork = None) -> CodeAnalysis:
+    n_jumpdests, n_blocks = ANALYSIS.unpack_from(data)
+    columns = []
+    offset = ANALYSIS.size
+    for typecode, length in (("I", n_jumpdests), ("I", n_blocks), ("I", n_blocks), ("Q", n_blocks)):
+        column = array(typecode)
+        column.frombytes(data[offset:offset + length * column.itemsize])
+        offset += length * column.itemsize
+        columns.append(column)
+
+    jumpdests, starts, counts, gas = columns
+    return CodeAnalysis(frozenset(jumpdests), dict(zip(starts, zip(counts, gas))), hardfork)
+
+
+class Contract:
+    __slots__ = ("address", "code", "code_index", "_corpus")
+
+    def __init__(self, corpus: "Corpus", address: int, code_index: int) -> None:
+        self._corpus = corpus
+        self.address = address
+        self.code_index = code_index
+        self.code = corpus.code(code_index)
+
+    @property
+    def analysis(self) -> CodeAnalysis:
+        return self._corpus.analysis(self.code_index)
+
+    def __repr__(self) -> str:
+        return f"Contract(address=0x{self.address:040x}, code_index={self.code_index})"
+
+
+class Corpus:
+    """
+    A corpus file opened for running under hardfork (the latest by
+    default). Its stored analyses are only used when they were made for
+    that fork under the current analysis rules; otherwise each code is
+    analysed again the first time it is asked for.
+    """
+
+    def __init__(self, path: str, hardfork: Hardfork = None) -> None:
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        (magic, version, analysis_version, self._contracts, self._codes, fork_name,
+         self._contracts_at, self._codes_at, self._blob_at, self._analysis_at) = HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != VERSION:
+            raise CorpusFormatError({"path": path, "magic": magic, "version": version})
+
+        self.hardfork = get_hardfork(hardfork)
+        self.analysed_under = fork_name.rstrip(b"\x00").decode()
+        self.stale = analysis_version != ANALYSIS_VERSION or self.analysed_under != self.hardfork.name
+
+        self._analyses = {}
+        self._by_digest = None
+        self._analysis_hits = self._analysis_misses = 0
+
+    def __len__(self) -> int:
+        return self._contracts
+
+    def __getitem__(self, i: int) -> Contract:
+        if not 0 <= i < self._contracts:
+            raise IndexError(i)
+        address, code_index = CONTRACT.unpack_from(self._view, self._contracts_at + i * CONTRACT.size)
+        return Contract(self, int.from_bytes(address, "big"), code_index)
+
+    def __iter__(self) -> Iterator[Contract]:
+        return (self[i] for i in range(self._contracts))
+
+    def __enter__(self) -> "Corpus":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def unique_codes(self) -> int:
+        return self._codes
+
+    def _code_record(self, code_index: int) -> tuple:
+        return CODE.unpack_from(self._view, self._codes_at + code_index * CODE.size)
+
+    def code(self, code_index: int) -> memoryview:
+        _, offset, length, _, _ = self._code_record(code_index)
+        start = self._blob_at + offset
+        return self._view[start:start + length]
+
+    def analysis(self, code_index: int) -> CodeAnalysis:
+        analysis = self._analyses.get(code_index)
+        if analysis is None:
+            self._analysis_misses += 1
+            if self.stale:
+                analysis = analyse(self.code(code_index), self.hardfork)
+            else:
+                _, _, _, offset, length = self._code_record(code_index)
+                start = self._analysis_at + offset
+                analysis = unpack_analysis(self._view[start:start + length], self.hardfork)
+            self._analyses[code_index] = analysis
+        else:
+            self._analysis_hits += 1
+        return analysis
+
+    def cache_info(self) -> Tuple[int, int]:
+        # (hits, misses) of the unpacked analysis cache
+        return self._analysis_hits, self._analysis_misses
+
+    def find(self, code) -> int:
+        """
+        Index of the stored copy of code, or -1. The digest index is only
+        built on first use.
+        """
+        if self._by_digest is None:
+            self._by_digest = {self._code_record(i)[0]: i for i in range(self._codes)}
+        return self._by_digest.get(code_digest(code), -1)
+
+    def close(self) -> None:
+        self._analyses.clear()
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Contract.code views are still alive somewhere; the mapping
+            # goes away with the last of them
+            pass
+        self._file.close()
+
+
+def build_corpus(
+    path: str,
+    contracts: Iterable[Tuple[int, bytes]],
+    max_workers: int = None,
+    hardfork: Hardfork = None,
+) -> None:
+    """
+    Writes (address, code) pairs to a corpus at path, storing each distinct
+    code once and analysing the distinct codes in parallel under hardfork.
+    """
+    hardfork = get_hardfork(hardfork)
+    codes = []
+    index_by_digest = {}
+    entries = []
+    for address, code in contracts:
+        digest = code_digest(code)
+        code_index = index_by_digest.get(digest)
+        if code_index is None:
+            code_index = index_by_digest[digest] = len(codes)
+            codes.append((digest, bytes(code)))
+        entries.append((address, code_index))
+
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(codes) // (workers * 4))
+    with ProcessPoolExecutor(workers) as pool:
+        analyses = list(pool.map(functools.partial(pack_analysis, hardfork=hardfork), [code for _, code in codes], chunksize=chunksize))
+
+    contracts_at = HEADER.size
+    codes_at = contracts_at + CONTRACT.size * len(entries)
+    blob_at = codes_at + CODE.size * len(codes)
+    analysis_at = blob_at + sum(len(code) for _, code in codes)
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(
+            MAGIC, VERSION, ANALYSIS_VERSION, len(entries), len(codes), hardfork.name.encode(),
+            contracts_at, codes_at, blob_at, analysis_at,
+        ))
+        for address, code_index in entries:
+            f.write(CONTRACT.pack(address.to_bytes(20, "big"), code_index))
+
+        code_offset = analysis_offset = 0
+        for (digest, code), analysis in zip(codes, analyses):
+            f.write(CODE.pack(digest, code_offset, len(code), analysis_offset, len(analysis)))
+            code_offset += len(code)
+            analysis_offset += len(analysis)
+
+        for _, code in codes:
+            f.write(code)
+        for analysis in analyses:
+            f.write(analysis)
+
+
+def _read_listing(path: str) -> Iterator[Tuple[int, bytes]]:
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            address, code = line.split()
+            code = code[2:] if code.startswith("0x") else code
+            yield int(address, 16), bytes.fromhex(code)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m yolo_evm.corpus")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="build a corpus from '<address> <code>' lines")
+    build.add_argument("out")
+    build.add_argument("listing")
+    build.add_argument("--workers", type=int, default=None)
+    build.add_argument("--hardfork", default=None, help="fork to analyse for, the latest by default")
+    args = parser.parse_args(argv)
+
+    build_corpus(args.out, _read_listing(args.listing), max_workers=args.workers, hardfork=args.hardfork)
+    with Corpus(args.out, args.hardfork) as corpus:
+        print(f"{len(corpus)} contracts, {corpus.unique_codes} unique codes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
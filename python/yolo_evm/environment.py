@@ -0,0 +1,61 @@
+"""
+The block a transaction runs in, as seen by COINBASE, TIMESTAMP, NUMBER,
+DIFFICULTY, GASLIMIT, CHAINID and BASEFEE.
+
+A BlockEnvironment is built once per block and shared by every
+transaction and every call frame in it, so it is immutable: nothing can
+leak from one transaction into the next through it.
+"""
+
+
+class BlockEnvironment:
+    __slots__ = ("coinbase", "timestamp", "number", "difficulty", "gaslimit", "chainid", "basefee", "hardfork")
+
+    def __init__(
+        self,
+        coinbase: int = 0,
+        timestamp: int = 0,
+        number: int = 0,
+        difficulty: int = 0,
+        gaslimit: int = 30_000_000,
+        chainid: int = 1,
+        basefee: int = 0,
+        hardfork=None,
+    ) -> None:
+        setattr_ = object.__setattr__
+        setattr_(self, "coinbase", coinbase)
+        setattr_(self, "timestamp", timestamp)
+        setattr_(self, "number", number)
+        setattr_(self, "difficulty", difficulty)
+        setattr_(self, "gaslimit", gaslimit)
+        setattr_(self, "chainid", chainid)
+        setattr_(self, "basefee", basefee)
+        # the rules the block runs under, a forks.Hardfork or its name;
+        # None is the latest
+        setattr_(self, "hardfork", hardfork)
+
+    def __setattr__(self, name, value) -> None:
+        raise AttributeError(f"BlockEnvironment is immutable, cannot set {name}")
+
+    def __delattr__(self, name) -> None:
+        raise AttributeError(f"BlockEnvironment is immutable, cannot delete {name}")
+
+    def __reduce__(self):
+        # the default pickling of __slots__ objects goes through __setattr__
+        return (BlockEnvironment, tuple(getattr(self, name) for name in self.__slots__))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BlockEnvironment):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __hash__(self) -> int:
+        return hash(tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)}" for name in self.__slots__)
+        return f"BlockEnvironment({fields})"
+
+
+# for contexts created without a block, e.g. by runner.run
+DEFAULT_BLOCK = BlockEnvironment()
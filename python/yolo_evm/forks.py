@@ -0,0 +1,199 @@
+"""
+Hardforks: the EVM rule sets from Frontier to Cancun.
+
+Each Hardfork is defined by what it changes relative to the one before,
+and turns that into flat, immutable tables the first time they are asked
+for: a 256-entry handler tuple, static gas per opcode, and the opcodes
+that end a basic block. The runner picks a fork's tables
+once per execution, so the dispatch loop never checks which fork it is
+running under:
+
+    run(code, hardfork="byzantium")
+
+What changes between forks here: which instructions exist, static gas,
+EXP's price per exponent byte, CALL's price and EIP-150 gas forwarding,
+and the set and prices of the precompiles. Berlin's warm and cold access
+pricing (EIP-2929) and net-metered SSTORE are not modelled; from Istanbul
+on, account and storage access keep Istanbul's flat prices.
+"""
+import functools
+from typing import Dict, Iterable, Optional, Union
+
+from .gas import STATIC_GAS
+from .opcodes import (
+    REGISTRY, CALL, GAS, INVALID, JUMP, JUMPI, RETURN, STOP, call_handler, exp_handler,
+)
+from .precompiles import (
+    BLAKE2F, ECADD, ECMUL, ECPAIRING, ECRECOVER, IDENTITY, MODEXP, PRECOMPILES, RIPEMD160, SHA256,
+    G_ECADD_BYZANTIUM, G_ECMUL_BYZANTIUM, Precompile, gas_ecpairing_byzantium, gas_modexp_eip198,
+)
+
+
+class UnknownHardfork(Exception):
+    ...
+
+
+class Hardfork:
+    def __init__(
+        self,
+        name: str,
+        parent: "Hardfork" = None,
+        added: Iterable[str] = (),
+        gas: Dict[str, int] = None,
+        exp_byte_cost: int = None,
+        call_cost: int = None,
+        all_but_one_64th: bool = None,
+        new_account_only_with_value: bool = None,
+        precompiles: Dict[int, Precompile] = None,
+    ) -> None:
+        def inherit(value, attribute):
+            return value if value is not None else getattr(parent, attribute)
+
+        self.name = name
+        self.parent = parent
+        self.instructions = (parent.instructions if parent else frozenset()) | frozenset(added)
+        self.gas = {**(parent.gas if parent else STATIC_GAS), **(gas or {})}
+        self.exp_byte_cost = inherit(exp_byte_cost, "exp_byte_cost")
+        self.call_cost = inherit(call_cost, "call_cost")
+        self.all_but_one_64th = inherit(all_but_one_64th, "all_but_one_64th")
+        self.new_account_only_with_value = inherit(new_account_only_with_value, "new_account_only_with_value")
+        self.precompiles = inherit(precompiles, "precompiles")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.instructions
+
+    def __repr__(self) -> str:
+        return f"Hardfork({self.name})"
+
+    def __reduce__(self):
+        # the tables hold closures, so forks are pickled by name
+        return (get_hardfork, (self.name,))
+
+    def _defined(self):
+        # (opcode, instruction or None if this fork does not have it)
+        for op, instruction in enumerate(REGISTRY.by_code):
+            yield op, instruction if instruction is not None and instruction.name in self.instructions else None
+
+    @functools.cached_property
+    def handlers(self) -> tuple:
+        # anything this fork does not define dispatches to INVALID
+        special = {
+            "EXP": exp_handler(self.exp_byte_cost),
+            "CALL": call_handler(self.precompiles, self.call_cost, self.all_but_one_64th, self.new_account_only_with_value),
+        }
+        return tuple(
+            special.get(i.name, i.execute) if i is not None else INVALID.execute
+            for _, i in self._defined()
+        )
+
+    @functools.cached_property
+    def gas_table(self) -> tuple:
+        return tuple(self.gas.get(i.name, 0) if i is not None else 0 for _, i in self._defined())
+
+    @functools.cached_property
+    def block_terminators(self) -> frozenset:
+        # instructions that end a block; undefined opcodes halt, so they end
+        # one too. GAS and CALL read the gas left, which is only exact at the
+        # end of a block, since a block's static gas is paid up front.
+        return frozenset(
+            [i.opcode for i in (STOP, JUMP, JUMPI, RETURN, INVALID, GAS, CALL)]
+            + [op for op, i in self._defined() if i is None]
+        )
+
+
+def _repriced(precompile: Precompile, gas) -> Precompile:
+    # same computation and the same result cache, older prices
+    return Precompile(precompile.address, precompile.name, gas, precompile.run, cache_size=0)
+
+
+FRONTIER_PRECOMPILES = {p.address: p for p in (ECRECOVER, SHA256, RIPEMD160, IDENTITY)}
+BYZANTIUM_PRECOMPILES = {
+    **FRONTIER_PRECOMPILES,
+    MODEXP.address: _repriced(MODEXP, gas_modexp_eip198),
+    ECADD.address: _repriced(ECADD, lambda data: G_ECADD_BYZANTIUM),
+    ECMUL.address: _repriced(ECMUL, lambda data: G_ECMUL_BYZANTIUM),
+    ECPAIRING.address: _repriced(ECPAIRING, gas_ecpairing_byzantium),
+}
+ISTANBUL_PRECOMPILES = {
+    **BYZANTIUM_PRECOMPILES,
+    **{p.address: p for p in (ECADD, ECMUL, ECPAIRING, BLAKE2F)},
+}
+
+# instructions introduced after Frontier, by the fork that added them
+_LATER_INSTRUCTIONS = {
+    "RETURNDATASIZE", "RETURNDATACOPY",
+    "SHL", "SHR", "SAR",
+    "CHAINID", "SELFBALANCE",
+    "BASEFEE",
+    "PUSH0",
+    "MCOPY", "TLOAD", "TSTORE",
+}
+
+FRONTIER = Hardfork(
+    "frontier",
+    added=[i.name for i in REGISTRY if i.name not in _LATER_INSTRUCTIONS],
+    gas={"SLOAD": 50, "BALANCE": 20},
+    exp_byte_cost=10,
+    call_cost=40,
+    all_but_one_64th=False,
+    new_account_only_with_value=False,
+    precompiles=FRONTIER_PRECOMPILES,
+)
+# DELEGATECALL is Homestead's only new instruction, and it is not implemented
+HOMESTEAD = Hardfork("homestead", FRONTIER)
+# EIP-150
+TANGERINE_WHISTLE = Hardfork(
+    "tangerine_whistle",
+    HOMESTEAD,
+    gas={"SLOAD": 200, "BALANCE": 400},
+    call_cost=700,
+    all_but_one_64th=True,
+)
+# EIP-160, EIP-161
+SPURIOUS_DRAGON = Hardfork("spurious_dragon", TANGERINE_WHISTLE, exp_byte_cost=50, new_account_only_with_value=True)
+BYZANTIUM = Hardfork(
+    "byzantium",
+    SPURIOUS_DRAGON,
+    added=["RETURNDATASIZE", "RETURNDATACOPY"],
+    precompiles=BYZANTIUM_PRECOMPILES,
+)
+CONSTANTINOPLE = Hardfork("constantinople", BYZANTIUM, added=["SHL", "SHR", "SAR"])
+PETERSBURG = Hardfork("petersburg", CONSTANTINOPLE)
+# EIP-1884 repricing, EIP-1108 cheaper alt_bn128, EIP-152 BLAKE2F
+ISTANBUL = Hardfork(
+    "istanbul",
+    PETERSBURG,
+    added=["CHAINID", "SELFBALANCE"],
+    gas={"SLOAD": 800, "BALANCE": 700},
+    precompiles=ISTANBUL_PRECOMPILES,
+)
+# EIP-2565 MODEXP pricing
+BERLIN = Hardfork("berlin", ISTANBUL, precompiles=PRECOMPILES)
+LONDON = Hardfork("london", BERLIN, added=["BASEFEE"])
+SHANGHAI = Hardfork("shanghai", LONDON, added=["PUSH0"])
+CANCUN = Hardfork("cancun", SHANGHAI, added=["MCOPY", "TLOAD", "TSTORE"])
+
+HARDFORKS = {
+    fork.name: fork
+    for fork in (
+        FRONTIER, HOMESTEAD, TANGERINE_WHISTLE, SPURIOUS_DRAGON, BYZANTIUM, CONSTANTINOPLE,
+        PETERSBURG, ISTANBUL, BERLIN, LONDON, SHANGHAI, CANCUN,
+    )
+}
+LATEST = CANCUN
+
+
+def get_hardfork(hardfork: Optional[Union[Hardfork, str]]) -> Hardfork:
+    """
+    Resolves a fork name (case and separators do not matter) to its
+    Hardfork. None is the latest fork.
+    """
+    if hardfork is None:
+        return LATEST
+    if isinstance(hardfork, Hardfork):
+        return hardfork
+    key = hardfork.lower().replace(" ", "_").replace("-", "_")
+    try:
+        return HARDFORKS[key]
+    except KeyError:
+        raise UnknownHardfork({"hardfork": hardfork, "known": sorted(HARDFORKS)}) from None
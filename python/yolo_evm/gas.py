@@ -0,0 +1,111 @@
+"""
+Gas schedule, named after appendix G of the yellow paper.
+
+STATIC_GAS is the fixed part of each instruction's cost, keyed by
+mnemonic. Dynamic parts (memory expansion, EXP's exponent bytes, copies,
+calls) are charged by the handlers themselves.
+"""
+
+G_ZERO = 0
+G_JUMPDEST = 1
+G_BASE = 2
+G_VERYLOW = 3
+G_LOW = 5
+G_MID = 8
+G_HIGH = 10
+G_EXP = 10
+G_EXPBYTE = 50
+G_MEMORY = 3
+G_QUADCOEFFDIV = 512
+G_BALANCE = 700
+G_SLOAD = 800
+G_SSET = 20000
+G_SRESET = 5000
+G_WARMACCESS = 100
+G_COPY = 3
+G_CALL = 700
+G_CALLVALUE = 9000
+G_CALLSTIPEND = 2300
+G_NEWACCOUNT = 25000
+G_LOG = 375
+G_LOGDATA = 8
+G_LOGTOPIC = 375
+
+STATIC_GAS = {
+    "STOP": G_ZERO,
+    "ADD": G_VERYLOW,
+    "MUL": G_LOW,
+    "SUB": G_VERYLOW,
+    "DIV": G_LOW,
+    "SDIV": G_LOW,
+    "MOD": G_LOW,
+    "SMOD": G_LOW,
+    "ADDMOD": G_MID,
+    "MULMOD": G_MID,
+    "EXP": G_EXP,
+    "SIGNEXTEND": G_LOW,
+    "LT": G_VERYLOW,
+    "GT": G_VERYLOW,
+    "SLT": G_VERYLOW,
+    "SGT": G_VERYLOW,
+    "EQ": G_VERYLOW,
+    "ISZERO": G_VERYLOW,
+    "AND": G_VERYLOW,
+    "OR": G_VERYLOW,
+    "XOR": G_VERYLOW,
+    "NOT": G_VERYLOW,
+    "BYTE": G_VERYLOW,
+    "SHL": G_VERYLOW,
+    "SHR": G_VERYLOW,
+    "SAR": G_VERYLOW,
+    "ADDRESS": G_BASE,
+    "BALANCE": G_BALANCE,
+    "ORIGIN": G_BASE,
+    "CALLER": G_BASE,
+    "CALLVALUE": G_BASE,
+    "CALLDATALOAD": G_VERYLOW,
+    "CALLDATASIZE": G_BASE,
+    "CALLDATACOPY": G_VERYLOW,
+    "RETURNDATASIZE": G_BASE,
+    "RETURNDATACOPY": G_VERYLOW,
+    "GASPRICE": G_BASE,
+    "COINBASE": G_BASE,
+    "TIMESTAMP": G_BASE,
+    "NUMBER": G_BASE,
+    "DIFFICULTY": G_BASE,
+    "GASLIMIT": G_BASE,
+    "CHAINID": G_BASE,
+    "SELFBALANCE": G_LOW,
+    "BASEFEE": G_BASE,
+    "SLOAD": G_SLOAD,
+    # SSTORE is priced entirely by its handler
+    "SSTORE": G_ZERO,
+    "POP": G_BASE,
+    "MLOAD": G_VERYLOW,
+    "MSTORE": G_VERYLOW,
+    "MSTORE8": G_VERYLOW,
+    "JUMP": G_MID,
+    "JUMPI": G_HIGH,
+    "PC": G_BASE,
+    "MSIZE": G_BASE,
+    "GAS": G_BASE,
+    "TLOAD": G_WARMACCESS,
+    "TSTORE": G_WARMACCESS,
+    "MCOPY": G_VERYLOW,
+    "PUSH0": G_BASE,
+    "JUMPDEST": G_JUMPDEST,
+    # CALL is priced entirely by its handler
+    "CALL": G_ZERO,
+    "RETURN": G_ZERO,
+    "INVALID": G_ZERO,
+}
+STATIC_GAS.update({f"PUSH{n}": G_VERYLOW for n in range(1, 33)})
+STATIC_GAS.update({f"DUP{n}": G_VERYLOW for n in range(1, 17)})
+STATIC_GAS.update({f"SWAP{n}": G_VERYLOW for n in range(1, 17)})
+# the data bytes are charged by the handler
+STATIC_GAS.update({f"LOG{n}": G_LOG + n * G_LOGTOPIC for n in range(5)})
+
+
+def memory_cost(words: int) -> int:
+    # C_mem(a) from the yellow paper: linear up to ~724 bytes, then quadratic
+    return G_MEMORY * words + words * words // G_QUADCOEFFDIV
@@ -0,0 +1,82 @@
+"""
+Keccak-256, as used by Ethereum (the original padding, not SHA3-256's).
+hashlib only ships the NIST variant, so this is a plain Python sponge.
+"""
+
+RATE = 136
+MASK64 = 2 ** 64 - 1
+
+
+def _round_constants() -> list:
+    # generated from the LFSR in the spec rather than typed in
+    def rc_bit(t: int) -> int:
+        r = 1
+        for _ in range(t % 255):
+            r <<= 1
+            if r & 0x100:
+                r ^= 0x171
+        return r & 1
+
+    return [
+        sum(rc_bit(j + 7 * i) << (2 ** j - 1) for j in range(7))
+        for i in range(24)
+    ]
+
+
+def _rotation_offsets() -> list:
+    offsets = [0] * 25
+    x, y = 1, 0
+    for t in range(24):
+        offsets[x + 5 * y] = ((t + 1) * (t + 2) // 2) % 64
+        x, y = y, (2 * x + 3 * y) % 5
+    return offsets
+
+
+ROUND_CONSTANTS = _round_constants()
+ROTATIONS = _rotation_offsets()
+# where rho-pi moves each lane to
+PI = [y + 5 * ((2 * x + 3 * y) % 5) for y in range(5) for x in range(5)]
+PI_SOURCE = [x + 5 * y for y in range(5) for x in range(5)]
+
+
+def _rotl(v: int, n: int) -> int:
+    return ((v << n) | (v >> (64 - n))) & MASK64 if n else v
+
+
+def _keccak_f(a: list) -> None:
+    for rc in ROUND_CONSTANTS:
+        # theta
+        c = [a[x] ^ a[x + 5] ^ a[x + 10] ^ a[x + 15] ^ a[x + 20] for x in range(5)]
+        d = [c[(x - 1) % 5] ^ _rotl(c[(x + 1) % 5], 1) for x in range(5)]
+        for i in range(25):
+            a[i] ^= d[i % 5]
+
+        # rho and pi
+        b = [0] * 25
+        for src, dst in zip(PI_SOURCE, PI):
+            b[dst] = _rotl(a[src], ROTATIONS[src])
+
+        # chi
+        for y in range(0, 25, 5):
+            row = b[y:y + 5]
+            for x in range(5):
+                a[y + x] = row[x] ^ (~row[(x + 1) % 5] & row[(x + 2) % 5])
+
+        # iota
+        a[0] ^= rc
+
+
+def keccak256(data) -> bytes:
+    padded = bytearray(data)
+    padded.append(0x01)
+    padded.extend(bytes(-len(padded) % RATE))
+    padded[-1] |= 0x80
+
+    state = [0] * 25
+    for start in range(0, len(padded), RATE):
+        block = padded[start:start + RATE]
+        for i in range(RATE // 8):
+            state[i] ^= int.from_bytes(block[i * 8:i * 8 + 8], "little")
+        _keccak_f(state)
+
+    return b"".join(lane.to_bytes(8, "little") for lane in state[:4])
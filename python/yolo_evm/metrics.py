@@ -0,0 +1,281 @@
+"""
+Runtime metrics for the interpreter, exported in the Prometheus text format.
+
+Metrics are off by default and cost the runner one check per execution
+while off. Switch them on for the process with:
+
+    registry = metrics.enable()
+    ...
+    metrics.write_textfile(registry, "/var/lib/node_exporter/yolo_evm.prom")
+    # or
+    metrics.serve(registry, port=9464)
+
+Every execution is counted, nested CALL frames included. Instruction and
+per-opcode counts are exact, but they are worked out from how often each
+basic block was entered rather than counted per instruction, so the inner
+dispatch loop stays untouched. Peak stack depth is sampled at block
+boundaries.
+"""
+import bisect
+import os
+import threading
+from array import array
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+
+from .analysis import CodeAnalysis
+from .ExecutionContext import ExecutionContext, ExecutionLimitReached, OutOfGas
+from .opcodes import REGISTRY, PUSH1, PUSH32
+from .precompiles import PRECOMPILES
+
+PREFIX = "yolo_evm"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# upper bounds of the gas used histogram buckets
+GAS_BUCKETS = (1_000, 10_000, 21_000, 50_000, 100_000, 200_000, 500_000, 1_000_000, 3_000_000, 10_000_000, 30_000_000)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple) -> None:
+        self.buckets = buckets
+        # one count per bucket plus +Inf, not cumulative
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value: int) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class FrameMetrics:
+    """
+    What the runner records while one context runs: how many times each
+    block was entered, and the deepest stack seen on the way in.
+    """
+    __slots__ = ("entries", "peak_stack")
+
+    def __init__(self) -> None:
+        self.entries = {}
+        self.peak_stack = 0
+
+    def enter(self, pc: int, stack_depth: int) -> None:
+        self.entries[pc] = self.entries.get(pc, 0) + 1
+        if stack_depth > self.peak_stack:
+            self.peak_stack = stack_depth
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self.executions = 0
+        self.instructions = 0
+        self.opcodes = array("Q", bytes(8 * 256))
+        self.gas_used = Histogram(GAS_BUCKETS)
+        self.peak_stack_depth = 0
+        self.peak_memory = 0
+        self.halts = Counter()
+        # cache name -> function returning (hits, misses)
+        self.caches: Dict[str, Callable[[], Tuple[int, int]]] = {}
+
+        for precompile in PRECOMPILES.values():
+            cache_info = getattr(precompile.run, "cache_info", None)
+            if cache_info is not None:
+                self.track_cache(f"precompile_{precompile.name.lower()}", _lru_hits_and_misses(cache_info))
+
+    def track_cache(self, name: str, hits_and_misses: Callable[[], Tuple[int, int]]) -> None:
+        """
+        Reports a cache's hit rate, e.g.
+        metrics.track_cache("corpus_analysis", corpus.cache_info).
+        hits_and_misses is only called when metrics are exported.
+        """
+        self.caches[name] = hits_and_misses
+
+    def record(
+        self,
+        frame: FrameMetrics,
+        context: ExecutionContext,
+        analysis: CodeAnalysis,
+        gas_limit: int,
+        halt: Optional[Exception],
+    ) -> None:
+        self.executions += 1
+        self.halts[_halt_reason(context, halt)] += 1
+
+        executed = _count_opcodes(context.code, analysis.blocks, frame.entries, self.opcodes)
+        if halt is not None:
+            executed -= _uncount_rest_of_block(context.code, analysis.blocks, context.pc, self.opcodes)
+        self.instructions += executed
+
+        # a frame's gas includes its children's, so only count it once
+        if context.depth == 0:
+            self.gas_used.observe(gas_limit - context.gas)
+        self.peak_stack_depth = max(self.peak_stack_depth, frame.peak_stack, len(context.stack.stack))
+        self.peak_memory = max(self.peak_memory, len(context.memory))
+
+    def to_prometheus(self) -> str:
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples) -> None:
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}" if labels else ""
+                lines.append(f"{PREFIX}_{name}{suffix}{label_text} {value}")
+
+        metric("executions_total", "counter", "Contexts executed, nested calls included.", [("", (), self.executions)])
+        metric("instructions_total", "counter", "Instructions executed.", [("", (), self.instructions)])
+        metric(
+            "opcode_executions_total",
+            "counter",
+            "Instructions executed, by opcode.",
+            [("", (("opcode", _opcode_name(op)),), n) for op, n in enumerate(self.opcodes) if n],
+        )
+
+        buckets, cumulative = [], 0
+        for bound, n in zip(self.gas_used.buckets + ("+Inf",), self.gas_used.counts):
+            cumulative += n
+            buckets.append(("_bucket", (("le", bound),), cumulative))
+        metric(
+            "gas_used",
+            "histogram",
+            "Gas used by outermost executions.",
+            buckets + [("_sum", (), self.gas_used.sum), ("_count", (), self.gas_used.count)],
+        )
+
+        metric("peak_stack_depth", "gauge", "Deepest stack seen, sampled at basic block boundaries.", [("", (), self.peak_stack_depth)])
+        metric("peak_memory_bytes", "gauge", "Largest memory size reached.", [("", (), self.peak_memory)])
+        metric(
+            "halts_total",
+            "counter",
+            "Executions by how they ended.",
+            [("", (("reason", reason),), n) for reason, n in sorted(self.halts.items())],
+        )
+
+        hits, misses, ratios = [], [], []
+        for name, hits_and_misses in sorted(self.caches.items()):
+            h, m = hits_and_misses()
+            hits.append(("", (("cache", name),), h))
+            misses.append(("", (("cache", name),), m))
+            ratios.append(("", (("cache", name),), h / (h + m) if h + m else 0.0))
+        metric("cache_hits_total", "counter", "Cache hits.", hits)
+        metric("cache_misses_total", "counter", "Cache misses.", misses)
+        metric("cache_hit_ratio", "gauge", "Cache hits over lookups.", ratios)
+
+        return "\n".join(lines) + "\n"
+
+
+# the registry the runner reports to, None while metrics are off
+ACTIVE: Optional[Metrics] = None
+
+
+def enable(registry: Metrics = None) -> Metrics:
+    global ACTIVE
+    ACTIVE = registry if registry is not None else Metrics()
+    return ACTIVE
+
+
+def disable() -> None:
+    global ACTIVE
+    ACTIVE = None
+
+
+def write_textfile(registry: Metrics, path: str) -> None:
+    # written aside and renamed, so a scraper never reads half a file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(registry.to_prometheus())
+    os.replace(tmp_path, path)
+
+
+def serve(registry: Metrics, port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serves the registry at http://host:port/metrics from a daemon thread.
+    Call shutdown() on the returned server to stop it.
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _lru_hits_and_misses(cache_info) -> Callable[[], Tuple[int, int]]:
+    def hits_and_misses() -> Tuple[int, int]:
+        info = cache_info()
+        return info.hits, info.misses
+    return hits_and_misses
+
+
+def _opcode_name(op: int) -> str:
+    instruction = REGISTRY[op]
+    return instruction.name if instruction is not None else f"0x{op:02x}"
+
+
+def _halt_reason(context: ExecutionContext, halt: Optional[Exception]) -> str:
+    if isinstance(halt, ExecutionLimitReached):
+        return "limit"
+    if isinstance(halt, OutOfGas):
+        return "out_of_gas"
+    if halt is not None:
+        return "error"
+    if not context.success:
+        # the only failure that is not an exception
+        return "invalid"
+    return context.halt or "stop"
+
+
+def _block_instructions(code, start: int, count: int):
+    # (pc, opcode) of each instruction in the block
+    push1, push32 = PUSH1.opcode, PUSH32.opcode
+    pc = start
+    for _ in range(count):
+        op = code[pc]
+        yield pc, op
+        pc += op - push1 + 2 if push1 <= op <= push32 else 1
+
+
+def _count_opcodes(code, blocks: dict, entries: dict, opcodes: array) -> int:
+    total = 0
+    for start, times in entries.items():
+        count, _ = blocks[start]
+        for _, op in _block_instructions(code, start, count):
+            opcodes[op] += times
+        total += count * times
+    return total
+
+
+def _uncount_rest_of_block(code, blocks: dict, pc: int, opcodes: array) -> int:
+    """
+    An exceptional halt stops a block part way. Takes back the counts for
+    the instructions after pc in the block that was running and returns how
+    many there were. When the halt came before the block was entered, pc is
+    the start of the block, which the previous block ends at, so nothing is
+    taken back.
+    """
+    starts = sorted(blocks)
+    i = bisect.bisect_right(starts, pc - 1) - 1
+    if i < 0:
+        return 0
+    start = starts[i]
+    uncounted = 0
+    for at, op in _block_instructions(code, start, blocks[start][0]):
+        if at >= pc:
+            opcodes[op] -= 1
+            uncounted += 1
+    return uncounted
@@ -3,10 +3,18 @@ from dataclasses import dataclass
 from typing import Callable, Optional, Sequence, Union
 import sys
 from exceptions import InvalidJumpDestination
-from .constants import MAX_UINT256
-from .ExecutionContext import ExecutionContext
+from .constants import MAX_UINT256, MAX_UINT8
+from .gas import G_CALL, G_CALLSTIPEND, G_CALLVALUE, G_COPY, G_EXPBYTE, G_LOGDATA, G_NEWACCOUNT, G_SRESET, G_SSET
+from .ExecutionContext import Calldata, ExecutionContext, InvalidReturndataAccess, Log
+from .precompiles import PRECOMPILES, PrecompileError
+from .uint256 import (
+    add, sub, mul, div, sdiv, mod, smod, addmod, mulmod, exp, signextend,
+    lt, gt, slt, sgt, eq, iszero, and_, or_, xor, not_, byte, shl, shr, sar,
+)
 import helpers 
 
+CALL_DEPTH_LIMIT = 1024
+
 class Instruction:
     def __init__(self, opcode: int, name: str):
         self.opcode = opcode
@@ -15,6 +23,12 @@ class Instruction:
     def execute(self, context: ExecutionContext) -> None:
         raise NotImplementedError
 
+    def to_bytes(self) -> bytes:
+        return bytes([self.opcode])
+
+    def __repr__(self) -> str:
+        return self.name
+
 class UnknownOpcode(Exception):
     ...
 
@@ -22,9 +36,6 @@ class DivideByZero(Exception):
     ...
 
 
-class InvalidCodeOffset(Exception):
-    ...
-
 class DuplicateOpcode(Exception):
     ...
 
@@ -64,18 +75,12 @@ class InstructionRegistry:
 
 
 REGISTRY = InstructionRegistry()
-INSTRUCTIONS = []
-INSTRUCTIONS_BY_OPCODE = {}
 
 
 def register_instruction(opcode: int, name: str, execute_func: callable):
     instruction = Instruction(opcode, name)
     instruction.execute = execute_func
-    INSTRUCTIONS.append(instruction)
-
-    if opcode in INSTRUCTIONS_BY_OPCODE:
-        raise DuplicateOpcode({"opcode": opcode})
-    INSTRUCTIONS_BY_OPCODE[opcode] = instruction
+    REGISTRY.add(instruction)
 
     return instruction
 
@@ -87,6 +92,8 @@ def assemble(instructions: Sequence[Union[Instruction, int, object]], print_bin=
             result += item.to_bytes()
         elif isinstance(item, int):
             result += int_to_bytes(item)
+        elif isinstance(item, (bytes, bytearray)):
+            result += item
         elif callable(item):
             _instruction = REGISTRY[item]
             result += bytes([_instruction.opcode])
@@ -141,20 +148,190 @@ def assemble(instructions: Sequence[Union[Instruction, int, object]], print_bin=
 
     return result
 
-def swap(self,i: int) -> None:
-    if len(self.stack) < i:
-        raise StackUnderflow()
-    self.stack[-1], self.stack[-i-1] = self.stack[-i-1],self.stack[-1]
-
 def _do_jump(ctx:ExecutionContext, target_pc: int)->None:
     if target_pc not in ctx.jumpdests:
         raise InvalidJumpDestination(target_pc=target_pc,context=ctx)
-
-def execute_SUB(ctx: ExecutionContext) -> None:
-    a, b = ctx.stack.pop(), ctx.stack.pop()
-    ctx.stack.push((a - b) % 2 ** 256)
-
-
+    ctx.set_program_counter(target_pc)
+
+def exp_handler(byte_cost: int):
+    # the price per exponent byte changed in Spurious Dragon
+    def execute_EXP(ctx: ExecutionContext) -> None:
+        base, exponent = ctx.stack.pop(), ctx.stack.pop()
+        ctx.consume_gas(byte_cost * ((exponent.bit_length() + 7) // 8))
+        ctx.stack.push(exp(base, exponent))
+    return execute_EXP
+
+execute_EXP = exp_handler(G_EXPBYTE)
+
+def execute_MSTORE8(ctx: ExecutionContext) -> None:
+    offset, value = ctx.stack.pop(), ctx.stack.pop()
+    ctx.expand_memory(offset, 1)
+    ctx.memory.store(offset, value & MAX_UINT8)
+
+def execute_MLOAD(ctx: ExecutionContext) -> None:
+    offset = ctx.stack.pop()
+    ctx.expand_memory(offset, 32)
+    ctx.stack.push(int.from_bytes(ctx.memory.load_range(offset, 32), "big"))
+
+def execute_MSTORE(ctx: ExecutionContext) -> None:
+    offset, value = ctx.stack.pop(), ctx.stack.pop()
+    ctx.expand_memory(offset, 32)
+    ctx.memory.store_range(offset, value.to_bytes(32, "big"))
+
+def execute_CALLDATACOPY(ctx: ExecutionContext) -> None:
+    dest_offset, offset, size = ctx.stack.pop(), ctx.stack.pop(), ctx.stack.pop()
+    ctx.consume_gas(G_COPY * ((size + 31) // 32))
+    ctx.expand_memory(dest_offset, size)
+    data = ctx.calldata.data[offset:offset + size]
+    ctx.memory.store_range(dest_offset, bytes(data).ljust(size, b"\x00"))
+
+def execute_MCOPY(ctx: ExecutionContext) -> None:
+    dest_offset, offset, size = ctx.stack.pop(), ctx.stack.pop(), ctx.stack.pop()
+    ctx.consume_gas(G_COPY * ((size + 31) // 32))
+    # both ranges count towards memory expansion
+    ctx.expand_memory(offset, size)
+    ctx.expand_memory(dest_offset, size)
+    ctx.memory.store_range(dest_offset, ctx.memory.load_range(offset, size))
+
+def execute_RETURNDATACOPY(ctx: ExecutionContext) -> None:
+    dest_offset, offset, size = ctx.stack.pop(), ctx.stack.pop(), ctx.stack.pop()
+    # unlike calldata, reading past the end of return data is an error
+    if offset + size > len(ctx.last_returndata):
+        raise InvalidReturndataAccess({"offset": offset, "size": size, "length": len(ctx.last_returndata)})
+    ctx.consume_gas(G_COPY * ((size + 31) // 32))
+    ctx.expand_memory(dest_offset, size)
+    ctx.memory.store_range(dest_offset, ctx.last_returndata[offset:offset + size])
+
+def _log(topic_count: int):
+    def execute_LOG(ctx: ExecutionContext) -> None:
+        offset, size = ctx.stack.pop(), ctx.stack.pop()
+        topics = tuple(ctx.stack.pop() for _ in range(topic_count))
+        ctx.consume_gas(G_LOGDATA * size)
+        ctx.expand_memory(offset, size)
+        ctx.logs.append(Log(ctx.address, topics, ctx.memory.load_range(offset, size)))
+    return execute_LOG
+
+def _account_exists(ctx: ExecutionContext, address: int, precompiles: dict) -> bool:
+    state = ctx.state
+    return bool(state.balance(address) or state.nonce(address) or state.code(address)) or address in precompiles
+
+def _call(ctx: ExecutionContext, address: int, value: int, data: bytes, gas: int, precompiles: dict):
+    """
+    Runs the message call and returns (success, gas left, output). State
+    changes, the value transfer included, are rolled back if it fails.
+    """
+    state = ctx.state
+    if ctx.depth >= CALL_DEPTH_LIMIT or state.balance(ctx.address) < value:
+        # the call never starts, so all of its gas comes back
+        return False, gas, bytes()
+
+    snapshot = state.snapshot()
+    if value:
+        state.set_balance(ctx.address, state.balance(ctx.address) - value)
+        state.set_balance(address, state.balance(address) + value)
+
+    # precompiles run natively, without a frame of their own
+    precompile = precompiles.get(address)
+    if precompile is not None:
+        cost = precompile.gas(data)
+        if cost <= gas:
+            try:
+                return True, gas - cost, precompile.run(data)
+            except PrecompileError:
+                pass
+        state.revert(snapshot)
+        return False, 0, bytes()
+
+    code = state.code(address)
+    if not code:
+        return True, gas, bytes()
+
+    # runner imports this module, so its import has to wait until here
+    from .runner import execute
+
+    child = ExecutionContext(
+        code=code,
+        calldata=Calldata(data),
+        gas=gas,
+        max_memory=ctx.max_memory,
+        state=state,
+        address=address,
+        caller=ctx.address,
+        value=value,
+        depth=ctx.depth + 1,
+        block=ctx.block,
+        origin=ctx.origin,
+        gasprice=ctx.gasprice,
+        hardfork=ctx.hardfork,
+    )
+    # the call tree shares one step budget, deadline and tracer
+    child.steps, child.max_steps, child.deadline = ctx.steps, ctx.max_steps, ctx.deadline
+    child.tracer = ctx.tracer
+    execute(child)
+    ctx.steps = child.steps
+    if not child.success:
+        # an exceptional halt has burned everything it was given
+        state.revert(snapshot)
+        return False, child.gas, bytes()
+    ctx.logs.extend(child.logs)
+    return True, child.gas, child.returndata
+
+def call_handler(
+    precompiles: dict,
+    call_cost: int = G_CALL,
+    all_but_one_64th: bool = True,
+    new_account_only_with_value: bool = True,
+):
+    """
+    CALL for a given set of precompiles and price. Before EIP-150
+    (all_but_one_64th=False) the requested gas is forwarded as is, and
+    asking for more than is left runs out of gas. Before EIP-161
+    (new_account_only_with_value=False) calling an account that does not
+    exist costs G_NEWACCOUNT even when no value is sent.
+    """
+    def execute_CALL(ctx: ExecutionContext) -> None:
+        gas, address, value = ctx.stack.pop(), ctx.stack.pop(), ctx.stack.pop()
+        args_offset, args_size = ctx.stack.pop(), ctx.stack.pop()
+        ret_offset, ret_size = ctx.stack.pop(), ctx.stack.pop()
+        address &= (1 << 160) - 1
+
+        ctx.expand_memory(args_offset, args_size)
+        ctx.expand_memory(ret_offset, ret_size)
+
+        cost = call_cost
+        if value:
+            cost += G_CALLVALUE
+        if (value or not new_account_only_with_value) and not _account_exists(ctx, address, precompiles):
+            cost += G_NEWACCOUNT
+        ctx.consume_gas(cost)
+
+        callee_gas = gas
+        if all_but_one_64th:
+            callee_gas = min(gas, ctx.gas - ctx.gas // 64)
+        ctx.consume_gas(callee_gas)
+        if value:
+            callee_gas += G_CALLSTIPEND
+
+        data = ctx.memory.load_range(args_offset, args_size)
+        success, gas_left, output = _call(ctx, address, value, data, callee_gas, precompiles)
+
+        ctx.gas += gas_left
+        ctx.last_returndata = output
+        ctx.memory.store_range(ret_offset, output[:ret_size])
+        ctx.stack.push(1 if success else 0)
+    return execute_CALL
+
+execute_CALL = call_handler(PRECOMPILES)
+
+def execute_SSTORE(ctx: ExecutionContext) -> None:
+    slot, value = ctx.stack.pop(), ctx.stack.pop()
+    # pre-Istanbul pricing: setting a zero slot is expensive, the rest is a reset
+    ctx.consume_gas(G_SSET if value and not ctx.state.storage(ctx.address, slot) else G_SRESET)
+    ctx.state.set_storage(ctx.address, slot, value)
+
+def execute_INVALID(ctx: ExecutionContext) -> None:
+    # the dispatch loop has already moved past the opcode
+    ctx.fail(f"Invalid opcode 0x{ctx.code[ctx.pc - 1]:02x} @ pc={ctx.pc - 1}")
 
 def execute_JUMP(ctx: ExecutionContext)->None:
     _do_jump(ctx,ctx.stack.pop())
@@ -165,74 +342,56 @@ def execute_JUMPI(ctx: ExecutionContext)->None:
     if cond !=0:
         _do_jump(ctx,target_pc)
 
-def mul(ctx)->None:
-    val = int(ctx.stack.pop() * ctx.stack.pop())
-    val = val%2**256
-    ctx.stack.push(val)
-
 STOP = register_instruction(0x00, "STOP", (lambda ctx: ctx.stop()))
 
-ADD = register_instruction(
-    0x01,
-    "ADD",
-    (lambda ctx: ctx.stack.push((ctx.stack.pop() + ctx.stack.pop()) % 2 ** 256)),
+#ARITHMETIC INSTRUCTIONS
+# operands are popped left to right, so the first pop is the top of the stack
+ADD = register_instruction(0x01, "ADD", lambda ctx: ctx.stack.push(add(ctx.stack.pop(), ctx.stack.pop())))
+MUL = register_instruction(0x02, "MUL", lambda ctx: ctx.stack.push(mul(ctx.stack.pop(), ctx.stack.pop())))
+SUB = register_instruction(0x03, "SUB", lambda ctx: ctx.stack.push(sub(ctx.stack.pop(), ctx.stack.pop())))
+DIV = register_instruction(0x04, "DIV", lambda ctx: ctx.stack.push(div(ctx.stack.pop(), ctx.stack.pop())))
+SDIV = register_instruction(0x05, "SDIV", lambda ctx: ctx.stack.push(sdiv(ctx.stack.pop(), ctx.stack.pop())))
+MOD = register_instruction(0x06, "MOD", lambda ctx: ctx.stack.push(mod(ctx.stack.pop(), ctx.stack.pop())))
+SMOD = register_instruction(0x07, "SMOD", lambda ctx: ctx.stack.push(smod(ctx.stack.pop(), ctx.stack.pop())))
+ADDMOD = register_instruction(
+    0x08,
+    "ADDMOD",
+    lambda ctx: ctx.stack.push(addmod(ctx.stack.pop(), ctx.stack.pop(), ctx.stack.pop())),
 )
-
-SUB = register_instruction(
-    0x03,
-    "SUB",
-    execute_SUB,
-)
-
-MUL = register_instruction(
-    0x02,
-    "MUL",
-    mul,
+MULMOD = register_instruction(
+    0x09,
+    "MULMOD",
+    lambda ctx: ctx.stack.push(mulmod(ctx.stack.pop(), ctx.stack.pop(), ctx.stack.pop())),
 )
-def mod(ctx)->None:
-    val1 = ctx.stack.pop()
-    val2 = ctx.stack.pop()
-    if val2 ==0:
-        ctx.stack.push(0)
-        return
-
-    val = int(val1 % val2)
-    
-    ctx.stack.push(val)
-
-MOD = register_instruction(
-    0x06,
-    "MOD",
-    mod,
+EXP = register_instruction(0x0A, "EXP", execute_EXP)
+SIGNEXTEND = register_instruction(
+    0x0B,
+    "SIGNEXTEND",
+    lambda ctx: ctx.stack.push(signextend(ctx.stack.pop(), ctx.stack.pop())),
 )
-def div(ctx)->None:
-    val1 = ctx.stack.pop()
-    val2 = ctx.stack.pop()
-    if val2 ==0:
-        ctx.stack.push(0)
-        return
-
-    val = int(val1 / val2)
-    val = val%2**256
-    ctx.stack.push(val)
 
-
-
-
-
-
-DIV = register_instruction(
-    0x04,
-    "DIV",
-    div,
-)
+#COMPARISON AND BITWISE INSTRUCTIONS
+LT = register_instruction(0x10, "LT", lambda ctx: ctx.stack.push(lt(ctx.stack.pop(), ctx.stack.pop())))
+GT = register_instruction(0x11, "GT", lambda ctx: ctx.stack.push(gt(ctx.stack.pop(), ctx.stack.pop())))
+SLT = register_instruction(0x12, "SLT", lambda ctx: ctx.stack.push(slt(ctx.stack.pop(), ctx.stack.pop())))
+SGT = register_instruction(0x13, "SGT", lambda ctx: ctx.stack.push(sgt(ctx.stack.pop(), ctx.stack.pop())))
+EQ = register_instruction(0x14, "EQ", lambda ctx: ctx.stack.push(eq(ctx.stack.pop(), ctx.stack.pop())))
+ISZERO = register_instruction(0x15, "ISZERO", lambda ctx: ctx.stack.push(iszero(ctx.stack.pop())))
+AND = register_instruction(0x16, "AND", lambda ctx: ctx.stack.push(and_(ctx.stack.pop(), ctx.stack.pop())))
+OR = register_instruction(0x17, "OR", lambda ctx: ctx.stack.push(or_(ctx.stack.pop(), ctx.stack.pop())))
+XOR = register_instruction(0x18, "XOR", lambda ctx: ctx.stack.push(xor(ctx.stack.pop(), ctx.stack.pop())))
+NOT = register_instruction(0x19, "NOT", lambda ctx: ctx.stack.push(not_(ctx.stack.pop())))
+BYTE = register_instruction(0x1A, "BYTE", lambda ctx: ctx.stack.push(byte(ctx.stack.pop(), ctx.stack.pop())))
+SHL = register_instruction(0x1B, "SHL", lambda ctx: ctx.stack.push(shl(ctx.stack.pop(), ctx.stack.pop())))
+SHR = register_instruction(0x1C, "SHR", lambda ctx: ctx.stack.push(shr(ctx.stack.pop(), ctx.stack.pop())))
+SAR = register_instruction(0x1D, "SAR", lambda ctx: ctx.stack.push(sar(ctx.stack.pop(), ctx.stack.pop())))
 
 MSTORE8 = register_instruction(
     0x53,
     "MSTORE8",
-    (lambda ctx: ctx.memory.store(ctx.stack.pop(),ctx.stack.pop()%2**256)),
+    execute_MSTORE8,
 )
-MSTORE8 = register_instruction(
+RETURN = register_instruction(
     0xf3,
     "RETURN",
     (lambda ctx: ctx.set_return_data(ctx.stack.pop(),ctx.stack.pop())),
@@ -264,15 +423,59 @@ JUMPDEST = register_instruction(
 PC = register_instruction(
     0x58,
     "PC",
-  (lambda ctx: ctx.stack.push(ctx.pc)),
+  (lambda ctx: ctx.stack.push(ctx.pc - 1)),
 )
 
+#ENVIRONMENT AND STATE INSTRUCTIONS
+ADDRESS = register_instruction(0x30, "ADDRESS", lambda ctx: ctx.stack.push(ctx.address))
+BALANCE = register_instruction(0x31, "BALANCE", lambda ctx: ctx.stack.push(ctx.state.balance(ctx.stack.pop())))
+ORIGIN = register_instruction(0x32, "ORIGIN", lambda ctx: ctx.stack.push(ctx.origin))
+CALLER = register_instruction(0x33, "CALLER", lambda ctx: ctx.stack.push(ctx.caller))
+CALLVALUE = register_instruction(0x34, "CALLVALUE", lambda ctx: ctx.stack.push(ctx.value))
+
 CALLDATALOAD = register_instruction(
     0x35,
     "CALLDATALOAD",
   (lambda ctx: ctx.stack.push(ctx.calldata.read_word(ctx.stack.pop()))),
 )
+CALLDATASIZE = register_instruction(0x36, "CALLDATASIZE", lambda ctx: ctx.stack.push(len(ctx.calldata)))
+CALLDATACOPY = register_instruction(0x37, "CALLDATACOPY", execute_CALLDATACOPY)
+RETURNDATASIZE = register_instruction(0x3D, "RETURNDATASIZE", lambda ctx: ctx.stack.push(len(ctx.last_returndata)))
+RETURNDATACOPY = register_instruction(0x3E, "RETURNDATACOPY", execute_RETURNDATACOPY)
+GASPRICE = register_instruction(0x3A, "GASPRICE", lambda ctx: ctx.stack.push(ctx.gasprice))
+
+#BLOCK INSTRUCTIONS
+COINBASE = register_instruction(0x41, "COINBASE", lambda ctx: ctx.stack.push(ctx.block.coinbase))
+TIMESTAMP = register_instruction(0x42, "TIMESTAMP", lambda ctx: ctx.stack.push(ctx.block.timestamp))
+NUMBER = register_instruction(0x43, "NUMBER", lambda ctx: ctx.stack.push(ctx.block.number))
+DIFFICULTY = register_instruction(0x44, "DIFFICULTY", lambda ctx: ctx.stack.push(ctx.block.difficulty))
+GASLIMIT = register_instruction(0x45, "GASLIMIT", lambda ctx: ctx.stack.push(ctx.block.gaslimit))
+CHAINID = register_instruction(0x46, "CHAINID", lambda ctx: ctx.stack.push(ctx.block.chainid))
+SELFBALANCE = register_instruction(0x47, "SELFBALANCE", lambda ctx: ctx.stack.push(ctx.state.balance(ctx.address)))
+BASEFEE = register_instruction(0x48, "BASEFEE", lambda ctx: ctx.stack.push(ctx.block.basefee))
+
+SLOAD = register_instruction(
+    0x54,
+    "SLOAD",
+  lambda ctx: ctx.stack.push(ctx.state.storage(ctx.address, ctx.stack.pop())),
+)
+SSTORE = register_instruction(0x55, "SSTORE", execute_SSTORE)
+MLOAD = register_instruction(0x51, "MLOAD", execute_MLOAD)
+MSTORE = register_instruction(0x52, "MSTORE", execute_MSTORE)
+GAS = register_instruction(0x5A, "GAS", lambda ctx: ctx.stack.push(ctx.gas))
+TLOAD = register_instruction(
+    0x5C,
+    "TLOAD",
+    lambda ctx: ctx.stack.push(ctx.state.transient_storage(ctx.address, ctx.stack.pop())),
+)
+TSTORE = register_instruction(
+    0x5D,
+    "TSTORE",
+    lambda ctx: ctx.state.set_transient_storage(ctx.address, ctx.stack.pop(), ctx.stack.pop()),
+)
+MCOPY = register_instruction(0x5E, "MCOPY", execute_MCOPY)
 #PUSH INSTRUCTIONS
+PUSH0 = register_instruction(0x5F, "PUSH0", lambda ctx: ctx.stack.push(0))
 PUSH1 = register_instruction(0x60, "PUSH1", lambda ctx: ctx.stack.push(ctx.read_code(1)))
 PUSH2 = register_instruction(0x61, "PUSH2", lambda ctx: ctx.stack.push(ctx.read_code(2)))
 PUSH3 = register_instruction(0x62, "PUSH3", lambda ctx: ctx.stack.push(ctx.read_code(3)))
@@ -306,6 +509,15 @@ PUSH30 = register_instruction(0x7D, "PUSH30", lambda ctx: ctx.stack.push(ctx.rea
 PUSH31 = register_instruction(0x7E, "PUSH31", lambda ctx: ctx.stack.push(ctx.read_code(31)))
 PUSH32 = register_instruction(0x7F, "PUSH32", lambda ctx: ctx.stack.push(ctx.read_code(32)))
 
+PUSH1_OPCODE = PUSH1.opcode
+
+def PUSH(value: int) -> bytes:
+    """
+    Assembles the smallest PUSHn that holds value, operand included.
+    """
+    data = int_to_bytes(value)
+    return bytes([PUSH1_OPCODE + len(data) - 1]) + data
+
 DUP1 = register_instruction(0x80, "DUP1", lambda ctx: ctx.stack.push(ctx.stack.peek(0)))
 DUP2 = register_instruction(0x81, "DUP2", lambda ctx: ctx.stack.push(ctx.stack.peek(1)))
 DUP3 = register_instruction(0x82, "DUP3", lambda ctx: ctx.stack.push(ctx.stack.peek(2)))
@@ -327,32 +539,30 @@ POP = register_instruction(0x50, "POP", lambda ctx: ctx.stack.pop())
 
 
 SWAP1 = register_instruction(0x90, "SWAP1", lambda ctx: ctx.stack.swap(1))
-def valid_jump_destinations(code: bytes) ->set[int]:
-    jumpdests=set()
-    i=0
-    while i<len(code):
-        current_op = code[i]
-        if current_op == JUMPDEST.opcode:
-            jumpdests.add(i)
-        elif PUSH1.opcode <= current_op <= PUSH32.opcode:
-            i+= current_op - PUSH1.opcode + 1
-        i+=1
-    return jumpdests
-
-def decode_opcode(context: ExecutionContext) -> Instruction:
-    if context.pc < 0:
-        raise InvalidCodeOffset({"code": context.code.hex(), "pc": context.pc})
-
-    # section 9.4.1 of the yellow paper, if pc is outside code, then the operation to be executed is STOP
-    if context.pc >= len(context.code):
-        return STOP
-
-    opcode = context.read_code(1)
-    instruction = INSTRUCTIONS_BY_OPCODE.get(opcode)
-    if instruction is None:
-        raise UnknownOpcode({"opcode": opcode})
-
-    return instruction
+SWAP2 = register_instruction(0x91, "SWAP2", lambda ctx: ctx.stack.swap(2))
+SWAP3 = register_instruction(0x92, "SWAP3", lambda ctx: ctx.stack.swap(3))
+SWAP4 = register_instruction(0x93, "SWAP4", lambda ctx: ctx.stack.swap(4))
+SWAP5 = register_instruction(0x94, "SWAP5", lambda ctx: ctx.stack.swap(5))
+SWAP6 = register_instruction(0x95, "SWAP6", lambda ctx: ctx.stack.swap(6))
+SWAP7 = register_instruction(0x96, "SWAP7", lambda ctx: ctx.stack.swap(7))
+SWAP8 = register_instruction(0x97, "SWAP8", lambda ctx: ctx.stack.swap(8))
+SWAP9 = register_instruction(0x98, "SWAP9", lambda ctx: ctx.stack.swap(9))
+SWAP10 = register_instruction(0x99, "SWAP10", lambda ctx: ctx.stack.swap(10))
+SWAP11 = register_instruction(0x9A, "SWAP11", lambda ctx: ctx.stack.swap(11))
+SWAP12 = register_instruction(0x9B, "SWAP12", lambda ctx: ctx.stack.swap(12))
+SWAP13 = register_instruction(0x9C, "SWAP13", lambda ctx: ctx.stack.swap(13))
+SWAP14 = register_instruction(0x9D, "SWAP14", lambda ctx: ctx.stack.swap(14))
+SWAP15 = register_instruction(0x9E, "SWAP15", lambda ctx: ctx.stack.swap(15))
+SWAP16 = register_instruction(0x9F, "SWAP16", lambda ctx: ctx.stack.swap(16))
+
+LOG0 = register_instruction(0xA0, "LOG0", _log(0))
+LOG1 = register_instruction(0xA1, "LOG1", _log(1))
+LOG2 = register_instruction(0xA2, "LOG2", _log(2))
+LOG3 = register_instruction(0xA3, "LOG3", _log(3))
+LOG4 = register_instruction(0xA4, "LOG4", _log(4))
+
+CALL = register_instruction(0xF1, "CALL", execute_CALL)
+INVALID = register_instruction(0xFE, "INVALID", execute_INVALID)
 
 
 # thanks, https://stackoverflow.com/questions/21017698/converting-int-to-bytes-in-python-3
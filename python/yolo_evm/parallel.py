@@ -0,0 +1,199 @@
+"""
+Optimistic parallel execution of a block of transactions.
+
+Every transaction is first run speculatively on a process pool, against
+the state as it was before the block, through a StateOverlay that records
+which keys it read and what it wrote. The speculative results are then
+validated in block order: a transaction whose reads do not touch anything
+an earlier transaction in the block wrote saw exactly the state it would
+have seen serially, so its writes are applied as they are. Anything else
+is re-executed on the spot against the up-to-date state. Either way the
+final state and results are the same as running the block serially.
+
+Every transaction that pays a tip would write the coinbase's balance, so
+tips are kept out of the read and write sets: they are added up during
+validation and paid in one go. Only a transaction that reads the coinbase
+balance itself needs the tips so far paid before it.
+
+Each worker process keeps its own copy of the state. A BlockExecutor keeps
+its pool across blocks, so a block only sends the workers what earlier
+blocks wrote rather than the whole state:
+
+    with BlockExecutor(state) as executor:
+        for transactions, block in blocks:
+            executor.execute_block(transactions, block)
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Sequence
+
+from .environment import DEFAULT_BLOCK, BlockEnvironment
+from .transaction import InvalidTransaction, Transaction, TransactionResult, apply_transaction
+from .WorldState import BALANCE, StateOverlay, WorldState
+
+# how many blocks' writes are kept for workers that missed them; one
+# further behind is sent the whole state
+KEPT_DELTAS = 16
+
+# the worker process's copy of the state, and how many blocks it has seen
+_REPLICA = None
+_VERSION = 0
+
+
+def _init_worker(data: dict) -> None:
+    global _REPLICA
+    _REPLICA = WorldState(data)
+
+
+def _speculate_one(tx: Transaction, block: BlockEnvironment) -> tuple:
+    overlay = StateOverlay(_REPLICA)
+    try:
+        result = apply_transaction(overlay, tx, block, pay_coinbase=False)
+    except InvalidTransaction as e:
+        # might become valid once earlier transactions are applied, so the
+        # error only counts if validation accepts this run
+        result = e
+    return overlay.reads, overlay.data, result
+
+
+def _speculate(version: int, since: int, delta: dict, block: BlockEnvironment, transactions: Sequence[Transaction]):
+    """
+    Brings the replica from version since to version with delta (since is
+    None when delta is the whole state) and runs transactions on it. A
+    worker at some other version runs nothing and returns the version it
+    is at instead, to be sent what it missed.
+    """
+    global _REPLICA, _VERSION
+    if _VERSION != version:
+        if since is None:
+            _REPLICA = WorldState(delta)
+        elif since == _VERSION:
+            _REPLICA.data.update(delta)
+        else:
+            return _VERSION
+        _VERSION = version
+    return [_speculate_one(tx, block) for tx in transactions]
+
+
+class BlockExecutor:
+    """
+    A process pool for executing blocks one after another against state.
+    While it is open, state must only change through execute_block, or
+    the workers' copies go stale.
+    """
+
+    def __init__(self, state: WorldState, max_workers: int = None) -> None:
+        self.state = state
+        self.workers = max_workers or os.cpu_count() or 1
+        # a copy, so a worker the pool starts later still begins at version 0
+        self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(dict(state.data),))
+        self._version = 0
+        # version -> what the block that led to it wrote
+        self._deltas = {}
+
+    def __enter__(self) -> "BlockExecutor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.shutdown()
+
+    def _delta_since(self, version: int) -> tuple:
+        # (since, delta) taking a replica at version to the current one
+        if any(v not in self._deltas for v in range(version + 1, self._version + 1)):
+            return None, self.state.data
+        delta = {}
+        for v in range(version + 1, self._version + 1):
+            delta.update(self._deltas[v])
+        return version, delta
+
+    def _speculate(self, transactions: Sequence[Transaction], block: BlockEnvironment) -> list:
+        chunksize = max(1, len(transactions) // (self.workers * 4))
+        chunks = [transactions[i:i + chunksize] for i in range(0, len(transactions), chunksize)]
+        # most workers only missed the last block
+        payload = self._delta_since(max(self._version - 1, 0))
+        futures = [self._pool.submit(_speculate, self._version, *payload, block, chunk) for chunk in chunks]
+
+        speculative = []
+        for chunk, future in zip(chunks, futures):
+            outcome = future.result()
+            while isinstance(outcome, int):
+                outcome = self._pool.submit(_speculate, self._version, *self._delta_since(outcome), block, chunk).result()
+            speculative.extend(outcome)
+        return speculative
+
+    def execute_block(self, transactions: Sequence[Transaction], block: BlockEnvironment = DEFAULT_BLOCK) -> List[TransactionResult]:
+        """
+        Applies transactions to the state in order and returns their
+        results, running them in parallel where they do not conflict. Like
+        transaction.apply_block, a transaction that would take the block
+        over its gas limit raises InvalidTransaction.
+        """
+        if not transactions:
+            return []
+
+        # every speculative run has finished before the state is written
+        speculative = self._speculate(transactions, block)
+
+        state = self.state
+        results = []
+        written = set()
+        coinbase = (BALANCE, block.coinbase)
+        cumulative_gas_used = 0
+        tips = 0
+
+        def pay_tips() -> None:
+            nonlocal tips
+            if tips:
+                state.data[coinbase] = state.balance(block.coinbase) + tips
+                written.add(coinbase)
+                tips = 0
+
+        try:
+            for tx, (reads, writes, result) in zip(transactions, speculative):
+                if cumulative_gas_used + tx.gas_limit > block.gaslimit:
+                    raise InvalidTransaction({"gas_limit": tx.gas_limit, "block_gas_left": block.gaslimit - cumulative_gas_used})
+                if coinbase in reads:
+                    pay_tips()
+                if not reads.isdisjoint(written):
+                    overlay = StateOverlay(state)
+                    try:
+                        result = apply_transaction(overlay, tx, block, pay_coinbase=False)
+                    except InvalidTransaction as e:
+                        result = e
+                    writes = overlay.data
+
+                if isinstance(result, InvalidTransaction):
+                    raise result
+
+                state.data.update(writes)
+                written.update(writes)
+                results.append(result)
+                cumulative_gas_used += result.gas_used
+                tips += (tx.gas_price - block.basefee) * result.gas_used
+        finally:
+            # what serial execution would have paid by now
+            pay_tips()
+            self._version += 1
+            self._deltas[self._version] = {key: state.data[key] for key in written}
+            self._deltas.pop(self._version - KEPT_DELTAS, None)
+
+        return results
+
+
+def execute_block(
+    state: WorldState,
+    transactions: Sequence[Transaction],
+    max_workers: int = None,
+    block: BlockEnvironment = DEFAULT_BLOCK,
+) -> List[TransactionResult]:
+    """
+    BlockExecutor.execute_block on a pool started for this block alone.
+    Use a BlockExecutor directly to keep the workers for the next block.
+    """
+    if not transactions:
+        return []
+    with BlockExecutor(state, max_workers) as executor:
+        return executor.execute_block(transactions, block)
@@ -0,0 +1,275 @@
+"""
+Precompiled contracts, the accounts at 0x01 to 0x09 whose code is native.
+
+CALL checks the precompiles before it builds a frame, so a precompile
+costs a dict lookup, its gas function and its run function; no
+ExecutionContext is created. PRECOMPILES is the current set; older
+hardforks (see forks.py) have fewer of them, some at older prices.
+
+Each precompile prices its input with `gas` and computes with `run`, and
+`run` is memoized on the input bytes: contracts that verify the same
+signature or pairing over and over only pay for it once.
+
+Invalid input raises PrecompileError, which fails the call and burns the
+gas it was given, like any other exceptional halt.
+"""
+import functools
+import hashlib
+from typing import Callable, Dict
+
+from . import blake2, bn254, secp256k1
+from .keccak import keccak256
+
+
+class PrecompileError(Exception):
+    ...
+
+
+class Precompile:
+    def __init__(self, address: int, name: str, gas: Callable[[bytes], int], run: Callable[[bytes], bytes], cache_size: int = 1024) -> None:
+        self.address = address
+        self.name = name
+        self.gas = gas
+        self.run = functools.lru_cache(maxsize=cache_size)(run) if cache_size else run
+
+    def __repr__(self) -> str:
+        return f"Precompile(0x{self.address:02x}, {self.name})"
+
+
+PRECOMPILES: Dict[int, Precompile] = {}
+
+
+def register_precompile(address: int, name: str, gas: Callable[[bytes], int], run: Callable[[bytes], bytes], cache_size: int = 1024) -> Precompile:
+    precompile = Precompile(address, name, gas, run, cache_size)
+    PRECOMPILES[address] = precompile
+    return precompile
+
+
+def _words(data: bytes) -> int:
+    return (len(data) + 31) // 32
+
+
+def _padded(data: bytes, length: int) -> bytes:
+    # input shorter than expected reads as if zero-padded on the right
+    return bytes(data[:length]).ljust(length, b"\x00")
+
+
+def _word(data: bytes, i: int) -> int:
+    return int.from_bytes(data[32 * i:32 * i + 32], "big")
+
+
+# 0x01 ECRECOVER
+G_ECRECOVER = 3000
+
+
+def run_ecrecover(data: bytes) -> bytes:
+    data = _padded(data, 128)
+    msg_hash, v, r, s = (_word(data, i) for i in range(4))
+    # a bad signature is not an error, it just recovers nothing
+    if v not in (27, 28):
+        return bytes()
+    public_key = secp256k1.recover_public_key(msg_hash, v - 27, r, s)
+    if public_key is None:
+        return bytes()
+    x, y = public_key
+    address = keccak256(x.to_bytes(32, "big") + y.to_bytes(32, "big"))[12:]
+    return address.rjust(32, b"\x00")
+
+
+# 0x02 SHA256, 0x03 RIPEMD160, 0x04 IDENTITY
+G_SHA256 = 60
+G_SHA256WORD = 12
+G_RIPEMD160 = 600
+G_RIPEMD160WORD = 120
+G_IDENTITY = 15
+G_IDENTITYWORD = 3
+
+
+def run_sha256(data: bytes) -> bytes:
+    return hashlib.sha256(data).digest()
+
+
+def run_ripemd160(data: bytes) -> bytes:
+    return hashlib.new("ripemd160", data).digest().rjust(32, b"\x00")
+
+
+def run_identity(data: bytes) -> bytes:
+    # the output is the input object itself, nothing is copied
+    return data
+
+
+# 0x05 MODEXP, priced per EIP-2565
+G_MODEXP_MIN = 200
+G_MODEXP_QUADDIVISOR = 3
+
+
+def _modexp_lengths(data: bytes):
+    head = _padded(data, 96)
+    return _word(head, 0), _word(head, 1), _word(head, 2)
+
+
+def _modexp_iterations(data: bytes, base_len: int, exp_len: int) -> int:
+    # only the first 32 bytes of the exponent are ever read here, however
+    # long exp_len claims it is
+    head_len = min(exp_len, 32)
+    exp_head = int.from_bytes(_padded(data[96 + base_len:96 + base_len + head_len], head_len), "big")
+    if exp_len <= 32:
+        return max(exp_head.bit_length() - 1, 0)
+    return 8 * (exp_len - 32) + max(exp_head.bit_length() - 1, 0)
+
+
+def gas_modexp(data: bytes) -> int:
+    base_len, exp_len, mod_len = _modexp_lengths(data)
+
+    words = (max(base_len, mod_len) + 7) // 8
+    multiplication_complexity = words * words
+    iterations = max(_modexp_iterations(data, base_len, exp_len), 1)
+
+    return max(G_MODEXP_MIN, multiplication_complexity * iterations // G_MODEXP_QUADDIVISOR)
+
+
+def gas_modexp_eip198(data: bytes) -> int:
+    # the original Byzantium pricing, in force until Berlin
+    base_len, exp_len, mod_len = _modexp_lengths(data)
+    x = max(base_len, mod_len)
+    if x <= 64:
+        multiplication_complexity = x * x
+    elif x <= 1024:
+        multiplication_complexity = x * x // 4 + 96 * x - 3072
+    else:
+        multiplication_complexity = x * x // 16 + 480 * x - 199680
+    iterations = max(_modexp_iterations(data, base_len, exp_len), 1)
+    return multiplication_complexity * iterations // 20
+
+
+def run_modexp(data: bytes) -> bytes:
+    base_len, exp_len, mod_len = _modexp_lengths(data)
+    if mod_len == 0:
+        return bytes()
+
+    body = _padded(data[96:], base_len + exp_len + mod_len)
+    base = int.from_bytes(body[:base_len], "big")
+    exponent = int.from_bytes(body[base_len:base_len + exp_len], "big")
+    modulus = int.from_bytes(body[base_len + exp_len:], "big")
+    if modulus == 0:
+        return bytes(mod_len)
+    return pow(base, exponent, modulus).to_bytes(mod_len, "big")
+
+
+# 0x06 ECADD, 0x07 ECMUL, 0x08 ECPAIRING on alt_bn128, Istanbul pricing
+G_ECADD = 150
+G_ECMUL = 6000
+G_ECPAIRING = 45000
+G_ECPAIRINGPOINT = 34000
+# and as they were priced in Byzantium
+G_ECADD_BYZANTIUM = 500
+G_ECMUL_BYZANTIUM = 40000
+G_ECPAIRING_BYZANTIUM = 100000
+G_ECPAIRINGPOINT_BYZANTIUM = 80000
+
+
+def _g1_point(data: bytes, i: int) -> bn254.G1Point:
+    x, y = _word(data, i), _word(data, i + 1)
+    if x >= bn254.P or y >= bn254.P:
+        raise PrecompileError({"g1": (x, y), "reason": "coordinate out of range"})
+    # (0, 0) encodes the point at infinity
+    point = None if x == 0 and y == 0 else (x, y)
+    if not bn254.g1_on_curve(point):
+        raise PrecompileError({"g1": (x, y), "reason": "not on curve"})
+    return point
+
+
+def _g2_point(data: bytes, i: int) -> bn254.G2Point:
+    # Fq2 elements are encoded imaginary part first
+    x_im, x_re, y_im, y_re = (_word(data, i + k) for k in range(4))
+    if max(x_im, x_re, y_im, y_re) >= bn254.P:
+        raise PrecompileError({"g2": (x_im, x_re, y_im, y_re), "reason": "coordinate out of range"})
+    if x_im == x_re == y_im == y_re == 0:
+        return None
+    point = ((x_re, x_im), (y_re, y_im))
+    if not bn254.g2_on_curve(point):
+        raise PrecompileError({"g2": point, "reason": "not on curve"})
+    # unlike G1, the twist has points outside the order-N subgroup
+    if bn254.g2_multiply(point, bn254.N) is not None:
+        raise PrecompileError({"g2": point, "reason": "not in subgroup"})
+    return point
+
+
+def _encode_g1(point: bn254.G1Point) -> bytes:
+    if point is None:
+        return bytes(64)
+    return point[0].to_bytes(32, "big") + point[1].to_bytes(32, "big")
+
+
+def run_ecadd(data: bytes) -> bytes:
+    data = _padded(data, 128)
+    return _encode_g1(bn254.g1_add(_g1_point(data, 0), _g1_point(data, 2)))
+
+
+def run_ecmul(data: bytes) -> bytes:
+    data = _padded(data, 96)
+    return _encode_g1(bn254.g1_multiply(_g1_point(data, 0), _word(data, 2)))
+
+
+def gas_ecpairing(data: bytes) -> int:
+    return G_ECPAIRING + G_ECPAIRINGPOINT * (len(data) // 192)
+
+
+def gas_ecpairing_byzantium(data: bytes) -> int:
+    return G_ECPAIRING_BYZANTIUM + G_ECPAIRINGPOINT_BYZANTIUM * (len(data) // 192)
+
+
+def run_ecpairing(data: bytes) -> bytes:
+    if len(data) % 192:
+        raise PrecompileError({"length": len(data), "reason": "not a multiple of 192"})
+    pairs = [(_g1_point(data, i), _g2_point(data, i + 2)) for i in range(0, len(data) // 32, 6)]
+    return (1 if bn254.pairing_check(pairs) else 0).to_bytes(32, "big")
+
+
+# 0x09 BLAKE2F, EIP-152: one gas per round
+BLAKE2F_INPUT_LENGTH = 213
+
+
+def gas_blake2f(data: bytes) -> int:
+    # malformed input is rejected by run, and costs nothing up front
+    if len(data) != BLAKE2F_INPUT_LENGTH:
+        return 0
+    return int.from_bytes(data[:4], "big")
+
+
+def run_blake2f(data: bytes) -> bytes:
+    if len(data) != BLAKE2F_INPUT_LENGTH:
+        raise PrecompileError({"length": len(data), "reason": f"expected {BLAKE2F_INPUT_LENGTH}"})
+    final = data[212]
+    if final not in (0, 1):
+        raise PrecompileError({"final": final, "reason": "final block flag must be 0 or 1"})
+
+    def lanes(start: int, count: int) -> list:
+        return [int.from_bytes(data[start + 8 * i:start + 8 * i + 8], "little") for i in range(count)]
+
+    rounds = int.from_bytes(data[:4], "big")
+    h = blake2.compress(rounds, lanes(4, 8), lanes(68, 16), lanes(196, 2), bool(final))
+    return b"".join(lane.to_bytes(8, "little") for lane in h)
+
+
+ECRECOVER = register_precompile(0x01, "ECRECOVER", lambda data: G_ECRECOVER, run_ecrecover)
+SHA256 = register_precompile(0x02, "SHA256", lambda data: G_SHA256 + G_SHA256WORD * _words(data), run_sha256)
+RIPEMD160 = register_precompile(
+    0x03,
+    "RIPEMD160",
+    lambda data: G_RIPEMD160 + G_RIPEMD160WORD * _words(data),
+    run_ripemd160,
+)
+# nothing to gain from caching a copy of the input
+IDENTITY = register_precompile(
+    0x04,
+    "IDENTITY",
+    lambda data: G_IDENTITY + G_IDENTITYWORD * _words(data),
+    run_identity,
+    cache_size=0,
+)
+MODEXP = register_precompile(0x05, "MODEXP", gas_modexp, run_modexp)
+ECADD = register_precompile(0x06, "ECADD", lambda data: G_ECADD, run_ecadd)
+ECMUL = register_precompile(0x07, "ECMUL", lambda data: G_ECMUL, run_ecmul)
+ECPAIRING = register_precompile(0x08, "ECPAIRING", gas_ecpairing, run_ecpairing)
+BLAKE2F = register_precompile(0x09, "BLAKE2F", gas_blake2f, run_blake2f)
@@ -1,22 +1,201 @@
-from .ExecutionContext import ExecutionContext
-from .opcodes import decode_opcode
+import math
+import time
+from typing import Union
 
+from exceptions import EVMException
+from . import metrics
+from .analysis import CodeAnalysis, analyse
+from .constants import MAX_UINT256
+from .ExecutionContext import ExecutionContext, ExecutionLimitReached, InvalidCalldataAccess, InvalidReturndataAccess, OutOfGas
+from .Memory import InvalidMemoryAccess, InvalidMemoryValue
+from .forks import Hardfork, get_hardfork
+from .opcodes import REGISTRY
+from .Stack import InvalidStackItem, StackOverflow, StackUnderflow
 
-def run(code: bytes) -> ExecutionContext:
+# errors that halt the current context as a failure, the way the EVM does,
+# rather than propagating out of run()
+EXCEPTIONAL_HALTS = (
+    EVMException,
+    OutOfGas,
+    StackUnderflow,
+    StackOverflow,
+    InvalidStackItem,
+    InvalidMemoryAccess,
+    InvalidMemoryValue,
+    InvalidCalldataAccess,
+    InvalidReturndataAccess,
+)
+
+
+def run(
+    code: bytes,
+    verbose=False,
+    gas_limit: int = MAX_UINT256,
+    max_steps: int = None,
+    max_memory: int = None,
+    max_time: float = None,
+    tracer=None,
+    analysis: CodeAnalysis = None,
+    hardfork: Union[Hardfork, str] = None,
+) -> ExecutionContext:
     """
     Executes code in a fresh context.
+
+    gas_limit is consensus gas; running out fails the context like any other
+    exceptional halt. max_steps (instructions), max_memory (bytes) and
+    max_time (seconds of wall-clock) are operator budgets for runaway code:
+    exceeding one raises ExecutionLimitReached.
+
+    tracer, e.g. a trace.TraceRecorder, is called around every instruction.
+    analysis skips analysing code again when it is already known, e.g. from
+    a corpus.Corpus.
+
+    hardfork selects the rule set, as a forks.Hardfork or a name such as
+    "istanbul"; the default is the latest.
+
+    While metrics are enabled (metrics.enable()), every execution is
+    recorded in the active registry.
     """
-    context = ExecutionContext(code=code)
-#60016002
+    context = ExecutionContext(code=code, gas=gas_limit, max_memory=max_memory, hardfork=hardfork)
+    execute(context, verbose=verbose, max_steps=max_steps, max_time=max_time, tracer=tracer, analysis=analysis)
+    return context
+
+
+def execute(
+    context: ExecutionContext,
+    verbose=False,
+    max_steps: int = None,
+    max_time: float = None,
+    tracer=None,
+    analysis: CodeAnalysis = None,
+    checkpoints=None,
+) -> None:
+    """
+    Runs context from its pc until it halts. checkpoints, e.g. a
+    checkpoint.CheckpointRecorder, is offered the context at the start of
+    every basic block, before the block's gas is charged.
+
+    max_steps, max_time and tracer are set on the context, and carry over
+    to the frames of any calls it makes: the whole call tree counts against
+    the same budgets and is traced as one.
+    """
+    if max_steps is not None:
+        context.max_steps = max_steps
+    if max_time is not None:
+        context.deadline = time.monotonic() + max_time
+    if tracer is not None:
+        context.tracer = tracer
+    tracer = context.tracer
+    hardfork = context.hardfork = get_hardfork(context.hardfork)
+    if analysis is None or analysis.hardfork is not hardfork:
+        analysis = analyse(context.code, hardfork)
+    context.jumpdests = analysis.jumpdests
+
+    registry = metrics.ACTIVE
+    frame = metrics.FrameMetrics() if registry is not None else None
+    gas_limit = context.gas
+    halt = None
+
+    if tracer is not None:
+        tracer.attach(context)
+    try:
+        _run_blocks(context, analysis.blocks, hardfork, verbose, tracer, frame, checkpoints)
+    except EXCEPTIONAL_HALTS as e:
+        halt = e
+        context.fail(str(e) or type(e).__name__)
+    except ExecutionLimitReached as e:
+        halt = e
+        raise
+    finally:
+        if tracer is not None:
+            tracer.detach()
+        if frame is not None:
+            registry.record(frame, context, analysis, gas_limit, halt)
+
+    if verbose:
+        print(f"Output: 0x{context.returndata.hex()}")
+
+
+def _run_blocks(
+    context: ExecutionContext,
+    blocks: dict,
+    hardfork: Hardfork,
+    verbose: bool,
+    tracer,
+    frame,
+    checkpoints,
+) -> None:
+    # budgets and static gas are settled once per basic block, so the inner
+    # loop is nothing but dispatch. Every loop goes back through a JUMPDEST,
+    # which always starts a block, so runaway code is still caught promptly.
+    handlers = hardfork.handlers
+    code = context.code
+    step_limit = context.max_steps if context.max_steps is not None else math.inf
+    deadline = context.deadline
+
     while not context.stopped:
-        print("STACK CONTINUE: " , context.stack.stack)
+        start = context.pc
+        block = blocks.get(start)
+        if block is None:
+            # only the end of the code is not a block start
+            # section 9.4.1 of the yellow paper, running off the end of the code is a STOP
+            context.stop()
+            break
+
+        count, gas = block
+        if checkpoints is not None:
+            checkpoints.record(context, start, count)
+        # the steps of calls made from the previous block are counted too
+        steps = context.steps + count
+        context.steps = steps
+        if steps > step_limit:
+            raise ExecutionLimitReached({"steps": steps, "max_steps": context.max_steps})
+        if deadline is not None and time.monotonic() > deadline:
+            raise ExecutionLimitReached({"deadline": deadline})
+        if tracer is not None:
+            if frame is not None:
+                frame.enter(start, len(context.stack.stack))
+            _run_block_traced(context, count, hardfork, tracer)
+            continue
+        context.consume_gas(gas)
+        if frame is not None:
+            frame.enter(start, len(context.stack.stack))
+
+        if verbose:
+            _run_block_verbose(context, count, hardfork)
+            continue
+
+        for _ in range(count):
+            pc = context.pc
+            context.pc = pc + 1
+            handlers[code[pc]](context)
+
+
+def _run_block_traced(context: ExecutionContext, count: int, hardfork: Hardfork, tracer) -> None:
+    # static gas is charged one instruction at a time here, so a step that
+    # cannot pay for itself is still traced, as other clients do
+    code = context.code
+    handlers, gas_table = hardfork.handlers, hardfork.gas_table
+    for _ in range(count):
+        pc = context.pc
+        opcode = code[pc]
+        tracer.before_step(context, context.gas)
+        context.pc = pc + 1
+        try:
+            context.consume_gas(gas_table[opcode])
+            handlers[opcode](context)
+        finally:
+            tracer.after_step(context)
+
+
+def _run_block_verbose(context: ExecutionContext, count: int, hardfork: Hardfork) -> None:
+    for _ in range(count):
         pc_before = context.pc
-        instruction = decode_opcode(context)
-        instruction.execute(context)
-        print(f"{instruction.name} @ pc={pc_before}")
+        opcode = context.read_code(1)
+        instruction = REGISTRY[opcode]
+        hardfork.handlers[opcode](context)
+        name = instruction.name if instruction is not None and instruction.name in hardfork else "INVALID"
+        print(f"{name} @ pc={pc_before}")
         print("stack: ", context.stack.stack)
-        print("memory: " ,context.memory.memory)
+        print("memory: " ,context.memory)
         print()
-    print(f"Output: 0x{context.returndata.hex()}")
-
-    return context
\ No newline at end of file
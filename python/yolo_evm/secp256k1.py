@@ -0,0 +1,103 @@
+"""
+Just enough secp256k1 for ECRECOVER: public key recovery from a signature.
+Points are kept in Jacobian coordinates so a scalar multiplication costs
+one field inversion at the end instead of one per step.
+"""
+from typing import Optional, Tuple
+
+P = 2 ** 256 - 2 ** 32 - 977
+N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+G = (
+    0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+    0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8,
+)
+
+# (x, y, z), z == 0 is the point at infinity
+Jacobian = Tuple[int, int, int]
+INFINITY = (0, 1, 0)
+
+
+def _to_jacobian(point: Tuple[int, int]) -> Jacobian:
+    return (point[0], point[1], 1)
+
+
+def _from_jacobian(point: Jacobian) -> Optional[Tuple[int, int]]:
+    x, y, z = point
+    if z == 0:
+        return None
+    z_inv = pow(z, -1, P)
+    z_inv2 = z_inv * z_inv % P
+    return (x * z_inv2 % P, y * z_inv2 * z_inv % P)
+
+
+def _double(point: Jacobian) -> Jacobian:
+    x, y, z = point
+    if z == 0 or y == 0:
+        return INFINITY
+    ysq = y * y % P
+    s = 4 * x * ysq % P
+    m = 3 * x * x % P
+    nx = (m * m - 2 * s) % P
+    ny = (m * (s - nx) - 8 * ysq * ysq) % P
+    nz = 2 * y * z % P
+    return (nx, ny, nz)
+
+
+def _add(p: Jacobian, q: Jacobian) -> Jacobian:
+    if p[2] == 0:
+        return q
+    if q[2] == 0:
+        return p
+    x1, y1, z1 = p
+    x2, y2, z2 = q
+    z1sq, z2sq = z1 * z1 % P, z2 * z2 % P
+    u1, u2 = x1 * z2sq % P, x2 * z1sq % P
+    s1, s2 = y1 * z2sq * z2 % P, y2 * z1sq * z1 % P
+    if u1 == u2:
+        return _double(p) if s1 == s2 else INFINITY
+    h = u2 - u1
+    r = s2 - s1
+    h2 = h * h % P
+    h3 = h * h2 % P
+    u1h2 = u1 * h2 % P
+    nx = (r * r - h3 - 2 * u1h2) % P
+    ny = (r * (u1h2 - nx) - s1 * h3) % P
+    nz = h * z1 * z2 % P
+    return (nx, ny, nz)
+
+
+def _multiply(point: Jacobian, k: int) -> Jacobian:
+    result = INFINITY
+    for bit in bin(k)[2:]:
+        result = _double(result)
+        if bit == "1":
+            result = _add(result, point)
+    return result
+
+
+def multiply(point: Tuple[int, int], k: int) -> Optional[Tuple[int, int]]:
+    return _from_jacobian(_multiply(_to_jacobian(point), k % N))
+
+
+def recover_public_key(msg_hash: int, v: int, r: int, s: int) -> Optional[Tuple[int, int]]:
+    """
+    The public key that produced signature (r, s) over msg_hash, with
+    recovery id v in {0, 1}, or None if there is none.
+    """
+    if not (0 < r < N and 0 < s < N and v in (0, 1)):
+        return None
+
+    x = r
+    alpha = (x * x * x + 7) % P
+    # P % 4 == 3, so a square root is a single exponentiation
+    y = pow(alpha, (P + 1) // 4, P)
+    if y * y % P != alpha:
+        return None
+    if y & 1 != v:
+        y = P - y
+
+    # Q = r^-1 (sR - eG)
+    r_inv = pow(r, -1, N)
+    sr = _multiply((x, y, 1), s * r_inv % N)
+    eg = _multiply(_to_jacobian(G), -msg_hash * r_inv % N)
+    return _from_jacobian(_add(sr, eg))
@@ -0,0 +1,368 @@
+"""
+Compact execution traces, for diffing our runs against other clients.
+
+A trace is a set of `array` columns with one entry per step (pc, opcode,
+gas, stack depth and call depth before the step) plus how the stack
+changed since the previous step of the same frame: how many items
+survived and what was pushed on top. Memory writes are recorded as spans
+along with the step that made them. Nothing is ever snapshotted, so a
+step costs a handful of bytes no matter how deep the stack or how large
+the memory.
+
+Frames entered by CALL are traced too, in the order they run: a CALL's
+step is followed by the steps of the frame it called, one call depth
+deeper, as in EIP-3155.
+
+Traces can be saved to disk and opened again with TraceFile, which
+memory-maps the file and rebuilds steps one at a time while iterating.
+first_divergence() walks two traces side by side (ours, or an EIP-3155
+JSON-lines file from another client) and stops at the first step that
+differs, so neither side is ever fully loaded.
+
+    python -m yolo_evm.trace diff ours.trace reference.jsonl
+"""
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from .ExecutionContext import ExecutionContext
+
+MAGIC = b"YTRC"
+VERSION = 2
+MAX_GAS = 2 ** 64 - 1
+
+# (name, array typecode), in file order; "B" columns holding raw bytes are
+# 32-byte stack words and memory write data
+COLUMNS = (
+    ("pc", "I"),
+    ("op", "B"),
+    ("gas", "Q"),
+    ("depth", "H"),
+    ("call_depth", "H"),
+    ("stack_keep", "H"),
+    ("stack_pushed", "B"),
+    ("stack_values", "B"),
+    ("mem_step", "I"),
+    ("mem_offset", "Q"),
+    ("mem_length", "I"),
+    ("mem_data", "B"),
+)
+
+HEADER = struct.Struct("<4sHHQ")
+SECTION = struct.Struct("<QQ")
+
+# no instruction reaches further down than SWAP16, so a step can only
+# change the top 17 stack items
+MAX_STACK_REACH = 17
+
+
+class TraceFormatError(Exception):
+    ...
+
+
+class Step(NamedTuple):
+    pc: int
+    op: int
+    gas: Optional[int]
+    depth: int
+    # the stack before the step, bottom first
+    stack: tuple
+    # 1 for the outermost frame, as in EIP-3155
+    call_depth: int = 1
+
+
+class _Frame:
+    # what the recorder keeps for each frame it is attached to
+    def __init__(self, memory, call_depth: int) -> None:
+        self.memory = memory
+        self.call_depth = call_depth
+        # the stack as of this frame's last step
+        self.shadow = []
+        # memory writes made by the step running now
+        self.writes = []
+        self.step = None
+
+
+class TraceRecorder:
+    def __init__(self) -> None:
+        for name, typecode in COLUMNS:
+            setattr(self, name, array(typecode))
+        # one per frame on the call stack, innermost last
+        self._frames = []
+
+    def __len__(self) -> int:
+        return len(self.pc)
+
+    def attach(self, context: ExecutionContext) -> None:
+        # shadowing store on the instance means untraced runs pay nothing
+        memory = context.memory
+        store, store_range = memory.store, memory.store_range
+        frame = _Frame(memory, context.depth + 1)
+        writes = frame.writes
+
+        def recording_store(offset: int, value: int) -> None:
+            store(offset, value)
+            writes.append((offset, bytes([value])))
+
+        def recording_store_range(offset: int, data: bytes) -> None:
+            store_range(offset, data)
+            if data:
+                writes.append((offset, bytes(data)))
+
+        memory.store = recording_store
+        memory.store_range = recording_store_range
+        self._frames.append(frame)
+
+    def detach(self) -> None:
+        if self._frames:
+            frame = self._frames.pop()
+            del frame.memory.store
+            del frame.memory.store_range
+
+    def before_step(self, context: ExecutionContext, gas: int) -> None:
+        frame = self._frames[-1]
+        pc = context.pc
+        frame.step = len(self.pc)
+        self.pc.append(pc)
+        self.op.append(context.code[pc])
+        self.gas.append(gas if gas < MAX_GAS else MAX_GAS)
+        self.depth.append(len(context.stack.stack))
+        self.call_depth.append(frame.call_depth)
+
+        # the stack is diffed here rather than after the step, so that a
+        # CALL's result is recorded after the steps of the frame it called
+        shadow, stack = frame.shadow, context.stack.stack
+        keep = min(len(shadow), len(stack))
+        for i in range(max(0, keep - MAX_STACK_REACH), keep):
+            if shadow[i] != stack[i]:
+                keep = i
+                break
+
+        pushed = stack[keep:]
+        self.stack_keep.append(keep)
+        self.stack_pushed.append(len(pushed))
+        for value in pushed:
+            self.stack_values.frombytes(value.to_bytes(32, "big"))
+        del shadow[keep:]
+        shadow.extend(pushed)
+
+    def after_step(self, context: ExecutionContext) -> None:
+        frame = self._frames[-1]
+        # coalesce the step's stores into contiguous spans
+        start = end = None
+        data = bytearray()
+        for offset, chunk in frame.writes:
+            if offset != end:
+                if start is not None:
+                    self._add_span(frame.step, start, data)
+                start, data = offset, bytearray()
+            data += chunk
+            end = offset + len(chunk)
+        if start is not None:
+            self._add_span(frame.step, start, data)
+        frame.writes.clear()
+
+    def _add_span(self, step: int, offset: int, data: bytearray) -> None:
+        self.mem_step.append(step)
+        self.mem_offset.append(offset)
+        self.mem_length.append(len(data))
+        self.mem_data.frombytes(data)
+
+    def steps(self) -> Iterator[Step]:
+        return _replay(self)
+
+    def save(self, path: str) -> None:
+        columns = [getattr(self, name) for name, _ in COLUMNS]
+        offset = _align(HEADER.size + SECTION.size * len(COLUMNS))
+        sections = []
+        for column in columns:
+            size = len(column) * column.itemsize
+            sections.append((offset, size))
+            offset = _align(offset + size)
+
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, len(self)))
+            for section in sections:
+                f.write(SECTION.pack(*section))
+            for (start, _), column in zip(sections, columns):
+                f.write(b"\0" * (start - f.tell()))
+                column.tofile(f)
+
+
+class TraceFile:
+    """
+    A saved trace, memory-mapped. Columns are memoryviews over the file,
+    so opening a trace reads only the header.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+
+        magic, version, _, self._steps = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise TraceFormatError({"path": path, "magic": magic, "version": version})
+
+        self._views = [view]
+        for i, (name, typecode) in enumerate(COLUMNS):
+            start, size = SECTION.unpack_from(view, HEADER.size + i * SECTION.size)
+            column = view[start:start + size].cast(typecode)
+            self._views.append(column)
+            setattr(self, name, column)
+
+    def __len__(self) -> int:
+        return self._steps
+
+    def __enter__(self) -> "TraceFile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def steps(self) -> Iterator[Step]:
+        return _replay(self)
+
+    def close(self) -> None:
+        # memoryviews have to go before the mmap under them can close
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+        self._file.close()
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _replay(trace) -> Iterator[Step]:
+    # rebuilds each step's stack from the deltas, one step at a time, with
+    # one stack per frame on the call stack
+    stacks = []
+    value_at = 0
+    pc, op, gas, depth, call_depth = trace.pc, trace.op, trace.gas, trace.depth, trace.call_depth
+    keep, pushed, values = trace.stack_keep, trace.stack_pushed, trace.stack_values
+
+    for i in range(len(trace)):
+        level = call_depth[i]
+        # a frame that returned is gone, one entered starts out empty
+        del stacks[level:]
+        while len(stacks) < level:
+            stacks.append([])
+        stack = stacks[level - 1]
+        del stack[keep[i]:]
+        for _ in range(pushed[i]):
+            stack.append(int.from_bytes(values[value_at:value_at + 32], "big"))
+            value_at += 32
+        yield Step(pc[i], op[i], gas[i], depth[i], tuple(stack), level)
+
+
+def read_eip3155(path: str) -> Iterator[Step]:
+    """
+    Steps from an EIP-3155 JSON-lines trace, read lazily. Lines without a
+    pc (the summary line at the end) are skipped.
+    """
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if "pc" not in record:
+                continue
+            stack = tuple(int(x, 16) for x in record.get("stack", ()))
+            gas = record.get("gas")
+            yield Step(
+                record["pc"],
+                record["op"],
+                int(gas, 16) if isinstance(gas, str) else gas,
+                len(stack),
+                stack,
+                record.get("depth", 1),
+            )
+
+
+def write_eip3155(steps: Iterable[Step], path: str) -> None:
+    with open(path, "w") as f:
+        for step in steps:
+            record = {
+                "pc": step.pc,
+                "op": step.op,
+                "gas": hex(step.gas),
+                "stack": [hex(x) for x in step.stack],
+                "depth": step.call_depth,
+            }
+            f.write(json.dumps(record) + "\n")
+
+
+class Divergence(NamedTuple):
+    index: int
+    ours: Optional[Step]
+    theirs: Optional[Step]
+    # which fields differ; "length" if one trace ended early
+    fields: tuple
+
+
+def first_divergence(ours: Iterable[Step], theirs: Iterable[Step]) -> Optional[Divergence]:
+    """
+    Walks both traces in lockstep and returns the first step that differs,
+    or None if they match. Gas is only compared when both sides have it.
+    """
+    ours, theirs = iter(ours), iter(theirs)
+    index = 0
+    while True:
+        a, b = next(ours, None), next(theirs, None)
+        if a is None and b is None:
+            return None
+        if a is None or b is None:
+            return Divergence(index, a, b, ("length",))
+
+        fields = tuple(
+            name for name in ("pc", "op", "call_depth", "stack")
+            if getattr(a, name) != getattr(b, name)
+        )
+        if a.gas is not None and b.gas is not None and a.gas != b.gas:
+            fields += ("gas",)
+        if fields:
+            return Divergence(index, a, b, fields)
+        index += 1
+
+
+def open_steps(path: str) -> Iterator[Step]:
+    with open(path, "rb") as f:
+        binary = f.read(len(MAGIC)) == MAGIC
+
+    if not binary:
+        yield from read_eip3155(path)
+        return
+
+    with TraceFile(path) as trace:
+        yield from trace.steps()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m yolo_evm.trace")
+    commands = parser.add_subparsers(dest="command", required=True)
+    diff = commands.add_parser("diff", help="find the first step where two traces differ")
+    diff.add_argument("ours", help="saved trace or EIP-3155 file")
+    diff.add_argument("theirs", help="saved trace or EIP-3155 file")
+    args = parser.parse_args(argv)
+
+    divergence = first_divergence(open_steps(args.ours), open_steps(args.theirs))
+    if divergence is None:
+        print("traces match")
+        return 0
+
+    print(f"traces diverge at step {divergence.index} ({', '.join(divergence.fields)})")
+    print(f"  ours:   {divergence.ours}")
+    print(f"  theirs: {divergence.theirs}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Transactions and blocks of them, applied to a WorldState.
+
+apply_block streams receipts as it goes, so a block can be fed from a
+generator and its receipts consumed one at a time. The block environment
+is built once by the caller and shared by everything that runs in it.
+"""
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+from .environment import DEFAULT_BLOCK, BlockEnvironment
+from .ExecutionContext import Calldata, ExecutionContext
+from .runner import execute
+from .WorldState import WorldState
+
+G_TRANSACTION = 21000
+G_TXDATAZERO = 4
+G_TXDATANONZERO = 16
+
+
+class InvalidTransaction(Exception):
+    ...
+
+
+@dataclass(frozen=True)
+class Transaction:
+    sender: int
+    to: int
+    # has to match the sender's account nonce, which it then bumps
+    nonce: int = 0
+    value: int = 0
+    data: bytes = bytes()
+    gas_limit: int = 1_000_000
+    gas_price: int = 0
+
+
+@dataclass(frozen=True)
+class TransactionResult:
+    success: bool
+    gas_used: int
+    returndata: bytes = bytes()
+    logs: tuple = ()
+
+
+@dataclass(frozen=True)
+class Receipt:
+    # 1 for success, 0 for failure
+    status: int
+    gas_used: int
+    cumulative_gas_used: int
+    logs: tuple = ()
+
+
+def intrinsic_gas(data: bytes) -> int:
+    # what a transaction costs before any of its code runs
+    zeros = data.count(0)
+    return G_TRANSACTION + G_TXDATAZERO * zeros + G_TXDATANONZERO * (len(data) - zeros)
+
+
+def apply_transaction(
+    state: WorldState,
+    tx: Transaction,
+    block: BlockEnvironment = DEFAULT_BLOCK,
+    pay_coinbase: bool = True,
+) -> TransactionResult:
+    """
+    Runs tx as a message call against state. The nonce bump and the gas
+    payment stick even if the call itself fails; the value transfer is
+    part of the call and is rolled back with it.
+
+    Gas is bought up front at tx.gas_price and what is left is refunded,
+    unless the call halted exceptionally, which uses up all of it. The base
+    fee is burned and the rest of the price goes to the coinbase. The price
+    has to cover the base fee, so only a block with a zero base fee takes a
+    zero price, and such a transaction never touches the coinbase's
+    balance. With pay_coinbase=False the tip,
+    (tx.gas_price - block.basefee) * gas_used, is left for the caller to
+    pay, and the coinbase is neither read nor written.
+    """
+    sender_nonce = state.nonce(tx.sender)
+    if tx.nonce != sender_nonce:
+        raise InvalidTransaction({"sender": tx.sender, "nonce": tx.nonce, "expected": sender_nonce})
+    intrinsic = intrinsic_gas(tx.data)
+    if tx.gas_limit < intrinsic:
+        raise InvalidTransaction({"gas_limit": tx.gas_limit, "intrinsic_gas": intrinsic})
+    if tx.gas_price < block.basefee:
+        raise InvalidTransaction({"gas_price": tx.gas_price, "basefee": block.basefee})
+
+    upfront = tx.gas_limit * tx.gas_price
+    sender_balance = state.balance(tx.sender)
+    if sender_balance < tx.value + upfront:
+        raise InvalidTransaction({"sender": tx.sender, "balance": sender_balance, "value": tx.value, "gas": upfront})
+
+    state.set_nonce(tx.sender, sender_nonce + 1)
+    if upfront:
+        sender_balance -= upfront
+        state.set_balance(tx.sender, sender_balance)
+
+    snapshot = state.snapshot()
+    # a zero-value call leaves both balances alone, so it does not read or
+    # write the recipient's balance and cannot conflict on it
+    if tx.value:
+        state.set_balance(tx.sender, sender_balance - tx.value)
+        state.set_balance(tx.to, state.balance(tx.to) + tx.value)
+    context = ExecutionContext(
+        code=state.code(tx.to),
+        calldata=Calldata(tx.data),
+        gas=tx.gas_limit - intrinsic,
+        state=state,
+        address=tx.to,
+        caller=tx.sender,
+        value=tx.value,
+        block=block,
+        origin=tx.sender,
+        gasprice=tx.gas_price,
+        hardfork=block.hardfork,
+    )
+    execute(context)
+    if not context.success:
+        state.revert(snapshot)
+
+    gas_left = context.gas if context.success else 0
+    gas_used = tx.gas_limit - gas_left
+    if tx.gas_price:
+        state.set_balance(tx.sender, state.balance(tx.sender) + gas_left * tx.gas_price)
+        tip = (tx.gas_price - block.basefee) * gas_used
+        if tip and pay_coinbase:
+            state.set_balance(block.coinbase, state.balance(block.coinbase) + tip)
+    state.commit()
+    state.clear_transient_storage()
+
+    return TransactionResult(context.success, gas_used, context.returndata, tuple(context.logs))
+
+
+def apply_block(state: WorldState, block: BlockEnvironment, transactions: Iterable[Transaction]) -> Iterator[Receipt]:
+    """
+    Applies transactions in order, yielding each one's receipt as soon as
+    it has run. A transaction that would take the block over its gas limit
+    raises InvalidTransaction, as does any other invalid one.
+    """
+    cumulative_gas_used = 0
+    for tx in transactions:
+        if cumulative_gas_used + tx.gas_limit > block.gaslimit:
+            raise InvalidTransaction({"gas_limit": tx.gas_limit, "block_gas_left": block.gaslimit - cumulative_gas_used})
+        result = apply_transaction(state, tx, block)
+        cumulative_gas_used += result.gas_used
+        yield Receipt(int(result.success), result.gas_used, cumulative_gas_used, result.logs)
@@ -0,0 +1,146 @@
+"""
+256-bit word arithmetic for the opcode handlers.
+
+Everything here takes and returns unsigned ints in [0, 2**256). The masks
+are computed once at import, and reductions use `& MASK` instead of
+`% 2**256` so the hot handlers never rebuild the modulus or do a bignum
+division just to wrap a result.
+"""
+from .constants import MAX_UINT256
+
+UINT256_CEILING = 2 ** 256
+MASK = MAX_UINT256
+SIGN_BIT = 2 ** 255
+BYTE_MASK = 0xFF
+
+
+# two's complement helpers
+# (x ^ SIGN_BIT) - SIGN_BIT flips the sign bit and re-biases, which maps
+# [2**255, 2**256) onto [-2**255, 0) without a comparison
+def to_signed(x: int) -> int:
+    return (x ^ SIGN_BIT) - SIGN_BIT
+
+
+def to_unsigned(x: int) -> int:
+    return x & MASK
+
+
+# arithmetic
+def add(a: int, b: int) -> int:
+    return (a + b) & MASK
+
+
+def sub(a: int, b: int) -> int:
+    return (a - b) & MASK
+
+
+def mul(a: int, b: int) -> int:
+    return (a * b) & MASK
+
+
+def div(a: int, b: int) -> int:
+    return a // b if b else 0
+
+
+def mod(a: int, b: int) -> int:
+    return a % b if b else 0
+
+
+def sdiv(a: int, b: int) -> int:
+    if not b:
+        return 0
+    sa, sb = to_signed(a), to_signed(b)
+    q = abs(sa) // abs(sb)
+    # quotient is negative iff exactly one operand is negative
+    # (-2**255 / -1 overflows back to -2**255, which the mask handles)
+    return (-q if (sa ^ sb) < 0 else q) & MASK
+
+
+def smod(a: int, b: int) -> int:
+    if not b:
+        return 0
+    sa, sb = to_signed(a), to_signed(b)
+    r = abs(sa) % abs(sb)
+    # the result takes the sign of the dividend
+    return (-r if sa < 0 else r) & MASK
+
+
+def addmod(a: int, b: int, n: int) -> int:
+    # the sum is not wrapped at 2**256 before reducing mod n
+    return (a + b) % n if n else 0
+
+
+def mulmod(a: int, b: int, n: int) -> int:
+    return (a * b) % n if n else 0
+
+
+def exp(base: int, exponent: int) -> int:
+    return pow(base, exponent, UINT256_CEILING)
+
+
+def signextend(b: int, x: int) -> int:
+    if b >= 31:
+        return x
+    sign = 1 << (b * 8 + 7)
+    return (((x & ((sign << 1) - 1)) ^ sign) - sign) & MASK
+
+
+# comparisons
+def lt(a: int, b: int) -> int:
+    return 1 if a < b else 0
+
+
+def gt(a: int, b: int) -> int:
+    return 1 if a > b else 0
+
+
+# flipping the sign bit turns a signed comparison into an unsigned one
+def slt(a: int, b: int) -> int:
+    return 1 if (a ^ SIGN_BIT) < (b ^ SIGN_BIT) else 0
+
+
+def sgt(a: int, b: int) -> int:
+    return 1 if (a ^ SIGN_BIT) > (b ^ SIGN_BIT) else 0
+
+
+def eq(a: int, b: int) -> int:
+    return 1 if a == b else 0
+
+
+def iszero(a: int) -> int:
+    return 0 if a else 1
+
+
+# bitwise
+def and_(a: int, b: int) -> int:
+    return a & b
+
+
+def or_(a: int, b: int) -> int:
+    return a | b
+
+
+def xor(a: int, b: int) -> int:
+    return a ^ b
+
+
+def not_(a: int) -> int:
+    return a ^ MASK
+
+
+def byte(i: int, x: int) -> int:
+    # i counts from the most significant byte
+    return (x >> (248 - i * 8)) & BYTE_MASK if i < 32 else 0
+
+
+def shl(shift: int, value: int) -> int:
+    return (value << shift) & MASK if shift < 256 else 0
+
+
+def shr(shift: int, value: int) -> int:
+    return value >> shift if shift < 256 else 0
+
+
+def sar(shift: int, value: int) -> int:
+    # shifting a signed value by 255 already leaves only the sign
+    return (to_signed(value) >> (shift if shift < 256 else 255)) & MASK